@@ -16,5 +16,38 @@ export function useApi() {
     });
   }
 
-  return { request };
+  // POST + server-sent events (event/data frames); calls onEvent per frame as it arrives
+  async function stream(path: string, body: any, onEvent: (event: string, data: any) => void): Promise<void> {
+    const headers: Record<string, string> = { "Content-Type": "application/json", Accept: "text/event-stream" };
+    if (auth.token) headers.Authorization = `Bearer ${auth.token}`;
+
+    const res = await fetch(`${config.public.apiBase}${path}`, { method: "POST", headers, body: JSON.stringify(body) });
+    if (!res.ok || !res.body) {
+      const detail = await res.json().catch(() => ({}));
+      throw { data: detail };
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buf = "";
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buf += decoder.decode(value, { stream: true });
+      let sep;
+      while ((sep = buf.indexOf("\n\n")) >= 0) {
+        const frame = buf.slice(0, sep);
+        buf = buf.slice(sep + 2);
+        let event = "message";
+        let data = "";
+        for (const line of frame.split("\n")) {
+          if (line.startsWith("event: ")) event = line.slice(7);
+          else if (line.startsWith("data: ")) data += line.slice(6);
+        }
+        onEvent(event, data ? JSON.parse(data) : null);
+      }
+    }
+  }
+
+  return { request, stream };
 }
@@ -0,0 +1,525 @@
+"""Load generator for DealerMate: replay captured MCP traffic or drive a synthetic intent mix.
+
+Modes
+-----
+replay     Re-issue tool calls recorded in the orchestrator's ``mcp:audit`` stream (or an
+           exported / spilled JSON-lines file of the same entries) against ``/tool/call`` and
+           ``/tool/batch``, keeping the original inter-arrival gaps divided by ``--speed``.
+synthetic  Send ``/assistant/assist`` requests at ``--rate`` per second (Poisson arrivals),
+           drawing messages per intent from the labeled corpus in services/api/scripts.
+export     Write a window of ``mcp:audit`` to a JSON-lines file for later replays.
+
+``--local`` starts the API, orchestrator and MCP services as local uvicorn processes, backed
+by an in-process fake Redis (fakeredis TCP server) and a throwaway SQLite database, so a run
+needs no Docker. ``--saturate`` additionally ramps closed-loop concurrency (1, 2, 4, ...)
+and reports the highest sustained throughput.
+
+The report lists p50/p95/p99 per intent (synthetic) and per tool. Per-tool numbers come from
+the client side for replays and from the audit stream (server side) for synthetic runs.
+
+Examples (from the repository root)::
+
+    python loadtest/harness.py synthetic --local --rate 20 --duration 30 --mix recommend=4,risk=3,pricing=2,compare=1
+    python loadtest/harness.py export --redis redis://localhost:6379/0 --since 2026-10-01T09:00 --until 2026-10-01T10:00 --out window.jsonl
+    python loadtest/harness.py replay --local --file window.jsonl --speed 5 --saturate
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+import redis
+
+ROOT = Path(__file__).resolve().parent.parent
+SERVICES = ROOT / "services"
+CORPUS = SERVICES / "api" / "scripts" / "intent_corpus.tsv"
+AUDIT_STREAM = "mcp:audit"
+
+
+# ---------------------------------------------------------------------------
+# Stats
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[idx]
+
+
+@dataclass
+class Recorder:
+    samples: dict[str, dict[str, list[float]]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(list)))
+    errors: dict[str, dict[str, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    started: float = field(default_factory=time.perf_counter)
+    finished: float | None = None
+
+    def add(self, group: str, name: str, ms: float, ok: bool = True) -> None:
+        self.samples[group][name].append(ms)
+        if not ok:
+            self.errors[group][name] += 1
+
+    def elapsed(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def table(self, group: str) -> list[dict[str, Any]]:
+        rows = []
+        for name, values in sorted(self.samples[group].items()):
+            v = sorted(values)
+            rows.append(
+                {
+                    group: name,
+                    "n": len(v),
+                    "errors": self.errors[group].get(name, 0),
+                    "p50_ms": round(percentile(v, 50), 1),
+                    "p95_ms": round(percentile(v, 95), 1),
+                    "p99_ms": round(percentile(v, 99), 1),
+                    "max_ms": round(v[-1], 1),
+                }
+            )
+        return rows
+
+
+def print_table(title: str, rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        return
+    print(f"\n{title}")
+    cols = list(rows[0])
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in cols}
+    print("  ".join(c.rjust(widths[c]) for c in cols))
+    for r in rows:
+        print("  ".join(str(r[c]).rjust(widths[c]) for c in cols))
+
+
+# ---------------------------------------------------------------------------
+# Local stand-ins
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalStack:
+    """API + orchestrator + MCP services as uvicorn subprocesses on a fake Redis."""
+
+    def __init__(self, extra_env: dict[str, str] | None = None) -> None:
+        self.extra_env = extra_env or {}
+        self.procs: list[subprocess.Popen] = []
+        self.tmp = tempfile.TemporaryDirectory(prefix="dealermate-load-")
+        self.redis_server = None
+        self.urls: dict[str, str] = {}
+
+    def _start_redis(self) -> str:
+        from fakeredis import TcpFakeServer
+
+        port = _free_port()
+        self.redis_server = TcpFakeServer(("127.0.0.1", port), server_type="redis")
+        threading.Thread(target=self.redis_server.serve_forever, daemon=True).start()
+        return f"redis://127.0.0.1:{port}/0"
+
+    def _spawn(self, service: str, env: dict[str, str]) -> str:
+        port = _free_port()
+        log = open(Path(self.tmp.name) / f"{service}.log", "wb")
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+            cwd=SERVICES / service,
+            env={**os.environ, **env, **self.extra_env},
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+        self.procs.append(proc)
+        return f"http://127.0.0.1:{port}"
+
+    def _wait_healthy(self, url: str, timeout: float = 30.0) -> None:
+        until = time.monotonic() + timeout
+        while time.monotonic() < until:
+            try:
+                if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"{url} did not become healthy (logs in {self.tmp.name})")
+
+    def __enter__(self) -> "LocalStack":
+        redis_url = self._start_redis()
+        for service in ("mcp-inventory", "mcp-history", "mcp-pricing"):
+            self.urls[service] = self._spawn(service, {"SERVICE_NAME": service})
+        self.urls["mcp-orchestrator"] = self._spawn(
+            "mcp-orchestrator",
+            {
+                "INVENTORY_BASE_URL": self.urls["mcp-inventory"],
+                "HISTORY_BASE_URL": self.urls["mcp-history"],
+                "PRICING_BASE_URL": self.urls["mcp-pricing"],
+                "REDIS_URL": redis_url,
+                "AUDIT_SPILL_PATH": str(Path(self.tmp.name) / "audit-spill.jsonl"),
+            },
+        )
+        self.urls["api"] = self._spawn(
+            "api",
+            {
+                "DATABASE_URL": f"sqlite+aiosqlite:///{self.tmp.name}/api.db",
+                "JWT_SECRET": "loadtest",
+                "MCP_ORCH_URL": self.urls["mcp-orchestrator"],
+                "REDIS_URL": redis_url,
+            },
+        )
+        self.urls["redis"] = redis_url
+        for name, url in self.urls.items():
+            if name != "redis":
+                self._wait_healthy(url)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        for proc in self.procs:
+            proc.terminate()
+        for proc in self.procs:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if self.redis_server is not None:
+            self.redis_server.shutdown()
+            self.redis_server.server_close()
+        self.tmp.cleanup()
+
+
+# ---------------------------------------------------------------------------
+# Sources
+
+
+def parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def read_audit(redis_url: str, since: str | None, until: str | None, limit: int | None) -> list[dict[str, str]]:
+    """Entries of ``mcp:audit`` in a time window (stream ids are millisecond timestamps)."""
+    lo = f"{int(parse_ts(since).timestamp() * 1000)}" if since else "-"
+    hi = f"{int(parse_ts(until).timestamp() * 1000)}" if until else "+"
+    client = redis.from_url(redis_url, decode_responses=True)
+    return [fields for _, fields in client.xrange(AUDIT_STREAM, min=lo, max=hi, count=limit)]
+
+
+def read_audit_file(path: str) -> list[dict[str, str]]:
+    with open(path, encoding="utf-8") as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+
+def load_corpus(mix: dict[str, float]) -> dict[str, list[str]]:
+    by_intent: dict[str, list[str]] = defaultdict(list)
+    for line in CORPUS.read_text(encoding="utf-8").splitlines():
+        if line.strip() and not line.startswith("#"):
+            label, message = line.split("\t", 1)
+            by_intent[label].append(message)
+    missing = [i for i in mix if not by_intent.get(i)]
+    if missing:
+        raise SystemExit(f"no corpus messages for: {', '.join(missing)}")
+    return by_intent
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        intent, _, weight = part.partition("=")
+        mix[intent.strip()] = float(weight or 1)
+    return mix
+
+
+# ---------------------------------------------------------------------------
+# Requests
+
+
+def replay_request(entry: dict[str, str]) -> tuple[str, str, dict[str, Any]]:
+    """``(tool label, path, body)`` for one audit entry (args are the masked ones that were logged)."""
+    args = json.loads(entry.get("args") or "{}")
+    if entry["tool"] == "batch":
+        return "batch", "/tool/batch", {"calls": args}
+    return entry["tool"], "/tool/call", {"tool": entry["tool"], "args": args}
+
+
+async def send_tool(client: httpx.AsyncClient, rec: Recorder, entry: dict[str, str]) -> None:
+    label, path, body = replay_request(entry)
+    t0 = time.perf_counter()
+    ok = True
+    try:
+        res = await client.post(path, json=body)
+        ok = res.status_code < 400
+        if ok and label == "batch":
+            for item in res.json().get("results", []):
+                rec.add("tool", item["tool"], float(item.get("latency_ms") or 0.0), item.get("status") == "ok")
+    except httpx.HTTPError:
+        ok = False
+    rec.add("tool", label, (time.perf_counter() - t0) * 1000, ok)
+
+
+async def send_assist(client: httpx.AsyncClient, rec: Recorder, message: str, label: str, session: int) -> None:
+    t0 = time.perf_counter()
+    intent, ok = label, True
+    try:
+        res = await client.post("/assistant/assist", json={"message": message, "session_id": f"load-{session}"})
+        ok = res.status_code < 400
+        if ok:
+            intent = res.json().get("intent", label)
+    except httpx.HTTPError:
+        ok = False
+    rec.add("intent", intent, (time.perf_counter() - t0) * 1000, ok)
+
+
+async def login(api_url: str, employee_id: str, password: str) -> str:
+    async with httpx.AsyncClient(base_url=api_url, timeout=10.0) as c:
+        res = await c.post("/auth/login", json={"employee_id": employee_id, "password": password})
+        res.raise_for_status()
+        return res.json()["access_token"]
+
+
+# ---------------------------------------------------------------------------
+# Drivers
+
+
+async def open_loop(schedule: list[tuple[float, Callable[[], Awaitable[None]]]]) -> None:
+    """Fire each request at its offset (seconds from start) without waiting for earlier ones."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    tasks = []
+    for offset, make in schedule:
+        delay = start + offset - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(make()))
+    await asyncio.gather(*tasks)
+
+
+async def closed_loop(make: Callable[[int], Awaitable[None]], concurrency: int, seconds: float) -> int:
+    """``concurrency`` workers issue requests back to back for ``seconds``; returns completions."""
+    until = time.perf_counter() + seconds
+    done = 0
+
+    async def worker(w: int) -> None:
+        nonlocal done
+        i = 0
+        while time.perf_counter() < until:
+            await make(w * 1_000_000 + i)
+            i += 1
+            done += 1
+
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return done
+
+
+async def saturate(make: Callable[[int], Awaitable[None]], max_concurrency: int, step_seconds: float) -> dict[str, Any]:
+    """Double concurrency until throughput stops improving by >5%; report the best step."""
+    steps = []
+    concurrency = 1
+    while concurrency <= max_concurrency:
+        n = await closed_loop(make, concurrency, step_seconds)
+        rps = n / step_seconds
+        steps.append({"concurrency": concurrency, "rps": round(rps, 1)})
+        print(f"  saturate: concurrency={concurrency:<4} {rps:8.1f} req/s")
+        if len(steps) >= 3 and rps < max(s["rps"] for s in steps[:-1]) * 1.05 and steps[-2]["rps"] < max(s["rps"] for s in steps[:-2]) * 1.05:
+            break
+        concurrency *= 2
+    best = max(steps, key=lambda s: s["rps"])
+    return {"saturation_rps": best["rps"], "at_concurrency": best["concurrency"], "steps": steps}
+
+
+def server_tool_latencies(redis_url: str, since_ms: int, rec: Recorder) -> None:
+    """Per-tool latency as recorded by the orchestrator (finished_at - started_at)."""
+    client = redis.from_url(redis_url, decode_responses=True)
+    for _, fields in client.xrange(AUDIT_STREAM, min=str(since_ms), max="+"):
+        ms = (parse_ts(fields["finished_at"]) - parse_ts(fields["started_at"])).total_seconds() * 1000
+        rec.add("tool", fields["tool"], ms)
+        if fields["tool"] == "batch":
+            # per-call latencies, unless the logged result preview was truncated
+            try:
+                items = json.loads(fields.get("result") or "[]")
+            except ValueError:
+                continue
+            for item in items:
+                rec.add("tool", item.get("tool", "?"), float(item.get("latency_ms") or 0.0), item.get("status") == "ok")
+
+
+# ---------------------------------------------------------------------------
+
+
+async def run_replay(args: argparse.Namespace, urls: dict[str, str]) -> dict[str, Any]:
+    entries = read_audit_file(args.file) if args.file else read_audit(args.redis, args.since, args.until, args.limit)
+    entries = [e for e in entries if e.get("tool") and e.get("started_at")]
+    if not entries:
+        raise SystemExit("no audit entries in the selected window")
+    entries.sort(key=lambda e: e["started_at"])
+    t_first = parse_ts(entries[0]["started_at"])
+    print(f"replaying {len(entries)} calls at x{args.speed}")
+
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=urls["mcp-orchestrator"], timeout=args.timeout, limits=limits) as client:
+        schedule = [
+            ((parse_ts(e["started_at"]) - t_first).total_seconds() / args.speed, (lambda e=e: send_tool(client, rec, e)))
+            for e in entries
+        ]
+        await open_loop(schedule)
+        rec.finished = time.perf_counter()
+        report: dict[str, Any] = {"mode": "replay", "calls": len(entries), "throughput_rps": round(len(entries) / rec.elapsed(), 1)}
+        if args.saturate:
+            sat = Recorder()
+            report["saturation"] = await saturate(
+                lambda i: send_tool(client, sat, entries[i % len(entries)]), args.max_concurrency, args.step_seconds
+            )
+    report["tools"] = rec.table("tool")
+    return report
+
+
+async def run_synthetic(args: argparse.Namespace, urls: dict[str, str], redis_url: str | None) -> dict[str, Any]:
+    mix = parse_mix(args.mix)
+    corpus = load_corpus(mix)
+    rnd = random.Random(args.seed)
+    intents, weights = list(mix), list(mix.values())
+
+    def pick() -> tuple[str, str]:
+        label = rnd.choices(intents, weights)[0]
+        return label, rnd.choice(corpus[label])
+
+    token = await login(urls["api"], args.employee_id, args.password)
+    since_ms = int(time.time() * 1000)
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=urls["api"], timeout=args.timeout, limits=limits, headers=headers) as client:
+        schedule = []
+        offset, i = 0.0, 0
+        while True:
+            offset += rnd.expovariate(args.rate)
+            if offset >= args.duration:
+                break
+            label, message = pick()
+            schedule.append((offset, (lambda m=message, lb=label, s=i % args.sessions: send_assist(client, rec, m, lb, s))))
+            i += 1
+        print(f"sending {len(schedule)} assist requests over {args.duration}s (~{args.rate}/s)")
+        await open_loop(schedule)
+        rec.finished = time.perf_counter()
+        report: dict[str, Any] = {
+            "mode": "synthetic",
+            "requests": len(schedule),
+            "throughput_rps": round(len(schedule) / rec.elapsed(), 1),
+        }
+        if redis_url:
+            # give the orchestrator's audit flusher a moment to write the tail (before any ramp traffic)
+            await asyncio.sleep(1.0)
+            server_tool_latencies(redis_url, since_ms, rec)
+        if args.saturate:
+            sat = Recorder()
+
+            async def one(i: int) -> None:
+                label, message = pick()
+                await send_assist(client, sat, message, label, i % args.sessions)
+
+            report["saturation"] = await saturate(one, args.max_concurrency, args.step_seconds)
+
+    report["intents"] = rec.table("intent")
+    report["tools"] = rec.table("tool")
+    return report
+
+
+def export(args: argparse.Namespace) -> None:
+    entries = read_audit(args.redis, args.since, args.until, args.limit)
+    with open(args.out, "w", encoding="utf-8") as fp:
+        for e in entries:
+            fp.write(json.dumps(e, ensure_ascii=False) + "\n")
+    print(f"wrote {len(entries)} entries to {args.out}")
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print(f"\nthroughput: {report['throughput_rps']} req/s ({report.get('requests') or report.get('calls')} requests)")
+    print_table("latency by intent (client side)", report.get("intents", []))
+    tool_side = "orchestrator audit" if report["mode"] == "synthetic" else "client side"
+    print_table(f"latency by tool ({tool_side})", report.get("tools", []))
+    if "saturation" in report:
+        sat = report["saturation"]
+        print(f"\nsaturation: {sat['saturation_rps']} req/s at concurrency {sat['at_concurrency']}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="mode", required=True)
+
+    def common(p: argparse.ArgumentParser) -> None:
+        p.add_argument("--local", action="store_true", help="start local stand-ins (fake Redis, SQLite)")
+        p.add_argument("--env", action="append", default=[], help="KEY=VALUE for the local services (repeatable)")
+        p.add_argument("--timeout", type=float, default=30.0)
+        p.add_argument("--max-connections", type=int, default=200)
+        p.add_argument("--saturate", action="store_true", help="also ramp closed-loop concurrency to find peak req/s")
+        p.add_argument("--max-concurrency", type=int, default=256)
+        p.add_argument("--step-seconds", type=float, default=5.0)
+        p.add_argument("--json", help="also write the report to this file")
+
+    rp = sub.add_parser("replay", help="replay mcp:audit traffic against the orchestrator")
+    common(rp)
+    rp.add_argument("--file", help="JSON-lines audit entries (see export / AUDIT_SPILL_PATH)")
+    rp.add_argument("--redis", default="redis://localhost:6379/0")
+    rp.add_argument("--since")
+    rp.add_argument("--until")
+    rp.add_argument("--limit", type=int)
+    rp.add_argument("--speed", type=float, default=1.0, help="divide original inter-arrival gaps by this")
+    rp.add_argument("--orchestrator", default="http://localhost:8010")
+
+    sp = sub.add_parser("synthetic", help="synthetic intent mix through /assistant/assist")
+    common(sp)
+    sp.add_argument("--api", default="http://localhost:8001")
+    sp.add_argument("--redis", help="orchestrator Redis, for per-tool latencies from mcp:audit")
+    sp.add_argument("--mix", default="recommend=4,risk=3,pricing=2,compare=1,followup=1,kpi=1")
+    sp.add_argument("--rate", type=float, default=10.0, help="requests per second")
+    sp.add_argument("--duration", type=float, default=30.0)
+    sp.add_argument("--sessions", type=int, default=50, help="distinct conversations (session_id)")
+    sp.add_argument("--seed", type=int, default=7)
+    sp.add_argument("--employee-id", default="D001")
+    sp.add_argument("--password", default="pass1234")
+
+    ep = sub.add_parser("export", help="write a window of mcp:audit to JSON lines")
+    ep.add_argument("--redis", default="redis://localhost:6379/0")
+    ep.add_argument("--since")
+    ep.add_argument("--until")
+    ep.add_argument("--limit", type=int)
+    ep.add_argument("--out", required=True)
+
+    args = ap.parse_args()
+    if args.mode == "export":
+        export(args)
+        return
+
+    extra_env = dict(kv.split("=", 1) for kv in args.env)
+    if args.local:
+        if args.mode == "replay" and not args.file:
+            raise SystemExit("--local replay needs --file (the local Redis starts empty)")
+        with LocalStack(extra_env) as stack:
+            redis_url = stack.urls["redis"]
+            report = asyncio.run(run_replay(args, stack.urls) if args.mode == "replay" else run_synthetic(args, stack.urls, redis_url))
+    else:
+        urls = {"mcp-orchestrator": getattr(args, "orchestrator", ""), "api": getattr(args, "api", "")}
+        report = asyncio.run(run_replay(args, urls) if args.mode == "replay" else run_synthetic(args, urls, args.redis))
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
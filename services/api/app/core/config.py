@@ -6,7 +6,33 @@ class Settings(BaseSettings):
     jwt_secret: str
     jwt_issuer: str = "dealermate"
     jwt_audience: str = "dealermate-web"
+    # Async SQLAlchemy engine pool (per worker process)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    # Verified-token / user principal cache in get_current_user (seconds, 0 disables)
+    auth_cache_ttl: float = 60.0
+    auth_cache_max_entries: int = 10000
+    # Write-behind Artifact/AuditLog persistence (see app.services.persister)
+    persist_queue_size: int = 5000
+    persist_batch_size: int = 500
+    persist_flush_interval: float = 0.5
+    persist_put_timeout: float = 2.0
+    persist_max_attempts: int = 3
+    # rows that still fail after retries and bisection are appended here (JSON lines)
+    persist_dead_letter_path: str = "/tmp/dealermate-dead-letter.jsonl"
     mcp_orch_url: str = "http://mcp-orchestrator:8000"
+    # Shared MCP orchestrator client (connection pool / timeouts in seconds)
+    mcp_pool_max_connections: int = 100
+    mcp_pool_max_keepalive: int = 20
+    mcp_pool_keepalive_expiry: float = 30.0
+    mcp_pool_timeout: float = 5.0
+    mcp_connect_timeout: float = 3.0
+    mcp_read_timeout: float = 20.0
+    mcp_http2: bool = True
+    # Overall deadline (seconds) for concurrent tool fan-out within one assist request
+    assist_fanout_deadline: float = 8.0
     redis_url: str = "redis://redis:6379/0"
     log_level: str = "INFO"
     # Comma-separated list, e.g. "http://localhost:3000,http://127.0.0.1:3000"
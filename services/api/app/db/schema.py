@@ -0,0 +1,49 @@
+import logging
+
+from sqlalchemy import Connection, func, inspect, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db.base import Base
+from app.models.deal import Deal
+
+log = logging.getLogger("dealermate")
+
+
+def count_legacy_duplicate_deals(conn: Connection) -> int:
+    """Number of ``(owner_user_id, customer_token)`` pairs shared by several deals.
+
+    Such pairs come from the pre-resolver ``hash % 99999`` tokens and usually belong to
+    different customers. They are reported only: the partial upsert index does not cover
+    legacy tokens, and merging them needs a reviewed migration, never a boot step.
+    """
+    dupes = (
+        select(Deal.owner_user_id, Deal.customer_token)
+        .group_by(Deal.owner_user_id, Deal.customer_token)
+        .having(func.count() > 1)
+        .subquery()
+    )
+    return conn.execute(select(func.count()).select_from(dupes)).scalar_one()
+
+
+def create_missing_indexes(conn: Connection) -> list[str]:
+    """Create indexes added after a table was first created (``create_all`` skips them).
+
+    No rows are changed. An index that cannot be created is logged and skipped so the
+    API keeps booting; the names of such indexes are returned.
+    """
+    missing = []
+    existing = {t: {ix["name"] for ix in inspect(conn).get_indexes(t)} for t in inspect(conn).get_table_names()}
+    for table in Base.metadata.sorted_tables:
+        for ix in table.indexes:
+            if ix.name in existing.get(table.name, set()):
+                continue
+            try:
+                with conn.begin_nested():
+                    ix.create(conn)
+            except SQLAlchemyError:
+                log.exception("could not create index %s; continuing without it", ix.name)
+                missing.append(ix.name)
+    legacy = count_legacy_duplicate_deals(conn)
+    if legacy:
+        log.warning("%d legacy customer tokens are shared by several deals; left as-is", legacy)
+    return missing
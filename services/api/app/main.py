@@ -2,19 +2,25 @@ import logging
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.metrics import install as install_metrics
 from app.db.base import Base
+from app.db.schema import create_missing_indexes
 from app.db.session import SessionLocal, engine
 from app.models.user import Role, User
 from app.routers import assist, auth, deals, health
+from app.services.deal_resolver import deal_resolver
+from app.services.mcp_client import mcp_client
+from app.services.persister import persister
 from app.utils.security import hash_password
 
 log = logging.getLogger("dealermate")
 
 
-def seed_users(db: Session):
+async def seed_users(db: AsyncSession):
     # Demo accounts
     users = [
         {"employee_id": "D001", "name": "딜러 홍길동", "branch_id": "BR01", "role": Role.dealer, "password": "pass1234"},
@@ -22,7 +28,7 @@ def seed_users(db: Session):
         {"employee_id": "A001", "name": "관리자", "branch_id": "HQ", "role": Role.admin, "password": "pass1234"},
     ]
     for u in users:
-        exists = db.query(User).filter(User.employee_id == u["employee_id"]).first()
+        exists = (await db.execute(select(User).where(User.employee_id == u["employee_id"]))).scalar_one_or_none()
         if exists:
             continue
         db.add(
@@ -34,7 +40,7 @@ def seed_users(db: Session):
                 password_hash=hash_password(u["password"]),
             )
         )
-    db.commit()
+    await db.commit()
 
 
 def create_app() -> FastAPI:
@@ -47,16 +53,41 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # per-stage timings for the browser devtools / chat UI
+        expose_headers=["Server-Timing"],
     )
 
     @app.on_event("startup")
-    def on_startup():
-        Base.metadata.create_all(bind=engine)
-        db = SessionLocal()
-        try:
-            seed_users(db)
-        finally:
-            db.close()
+    async def on_startup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            # create_all skips existing tables, so add indexes introduced later
+            missing = await conn.run_sync(create_missing_indexes)
+        deal_resolver.upsert = "uq_deals_owner_customer_token" not in missing
+        # a rejected artifact/audit row may point at a deal that no longer exists
+        persister.on_dead_letter.append(lambda rows, _: deal_resolver.forget(values.get("deal_id") for _, values in rows))
+        async with SessionLocal() as db:
+            await seed_users(db)
+
+    @app.on_event("startup")
+    async def open_mcp_client():
+        await mcp_client.start()
+
+    @app.on_event("shutdown")
+    async def close_mcp_client():
+        await mcp_client.aclose()
+
+    @app.on_event("startup")
+    async def start_persister():
+        await persister.start()
+
+    @app.on_event("shutdown")
+    async def dispose_engine():
+        # flush buffered artifacts/audit rows before the pool goes away
+        await persister.stop()
+        await engine.dispose()
+
+    install_metrics(app)
 
     app.include_router(health.router)
     app.include_router(auth.router)
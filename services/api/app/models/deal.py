@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import String, DateTime, Enum, Text, ForeignKey
+from sqlalchemy import String, DateTime, Enum, Text, ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -17,8 +17,27 @@ class DealStatus(str, enum.Enum):
     lost = "lost"
 
 
+# Tokens minted by the deal resolver: "CST-{user id}-{24 hex digest}". Older rows carry
+# "CST-{user id}-{hash % 99999}" tokens, which collide across customers, so the unique
+# upsert index only covers the resolver's format and leaves legacy rows untouched.
+RESOLVED_TOKEN_WHERE = text("customer_token LIKE 'CST-%-________________________'")
+
+
 class Deal(Base):
     __tablename__ = "deals"
+    # owner-scoped "recently updated" listing + keyset pagination (see routers/deals.py)
+    # (owner_user_id, customer_token) is the upsert key for anonymous deals (see services/deal_resolver.py)
+    __table_args__ = (
+        Index("ix_deals_owner_updated_at", "owner_user_id", "updated_at", "id"),
+        Index(
+            "uq_deals_owner_customer_token",
+            "owner_user_id",
+            "customer_token",
+            unique=True,
+            postgresql_where=RESOLVED_TOKEN_WHERE,
+            sqlite_where=RESOLVED_TOKEN_WHERE,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     owner_user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
@@ -1,17 +1,68 @@
+import asyncio
+import json
+import logging
+
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.db.session import SessionLocal, get_db
 from app.schemas.assist import AssistRequest, AssistResponse
 from app.services.assistant_service import AssistantService
 from app.utils.deps import get_current_user
 
+log = logging.getLogger("dealermate")
+
 router = APIRouter(prefix="/assistant", tags=["assistant"])
 
 svc = AssistantService()
 
+# producers outlive their stream when the client disconnects; keep a strong reference
+_producers: set[asyncio.Task] = set()
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
 
 @router.post("/assist", response_model=AssistResponse)
-async def assist(payload: AssistRequest, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    res = await svc.assist(db=db, user=user, message=payload.message, deal_id=payload.deal_id)
+async def assist(payload: AssistRequest, db: AsyncSession = Depends(get_db), user=Depends(get_current_user)):
+    res = await svc.assist(db=db, user=user, message=payload.message, deal_id=payload.deal_id, session_id=payload.session_id)
     return AssistResponse(**res)
+
+
+@router.post("/assist/stream")
+async def assist_stream(payload: AssistRequest, user=Depends(get_current_user)):
+    """Server-sent events: ``intent``, ``deal``, ``tool`` (one per result, as it arrives), ``result``.
+
+    The assist runs in its own task with its own session, so tool calls and persistence
+    complete even if the client goes away mid-stream.
+    """
+    queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+
+    async def produce() -> None:
+        try:
+            async with SessionLocal() as db:
+                async for event, data in svc.events(
+                    db, user, payload.message, deal_id=payload.deal_id, session_id=payload.session_id, incremental=True
+                ):
+                    queue.put_nowait(_sse(event, data))
+        except Exception as e:
+            log.exception("assist stream failed")
+            queue.put_nowait(_sse("error", {"detail": type(e).__name__}))
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(produce())
+    _producers.add(task)
+    task.add_done_callback(_producers.discard)
+
+    async def body():
+        while (chunk := await queue.get()) is not None:
+            yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,7 +1,10 @@
+import base64
 import json
+from datetime import datetime
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.models.deal import Deal
@@ -9,17 +12,68 @@ from app.utils.deps import get_current_user
 
 router = APIRouter(prefix="/deals", tags=["deals"])
 
+# Sparse projection: only the requested columns are selected (notes/preference blobs are opt-in)
+DEAL_FIELDS = {
+    "id": Deal.id,
+    "customer_token": Deal.customer_token,
+    "status": Deal.status,
+    "notes": Deal.notes,
+    "preference": Deal.preference_json,
+    "created_at": Deal.created_at,
+    "updated_at": Deal.updated_at,
+}
+DEFAULT_FIELDS = ("id", "customer_token", "status", "updated_at")
+
+
+def encode_cursor(updated_at: datetime, deal_id: int) -> str:
+    raw = json.dumps([updated_at.isoformat(), deal_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, deal_id = json.loads(raw)
+        return datetime.fromisoformat(ts), int(deal_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _render(field: str, value):
+    if field == "status":
+        return value.value
+    if field == "preference":
+        return json.loads(value or "{}")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
 
 @router.get("")
-def list_deals(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    qs = db.query(Deal).filter(Deal.owner_user_id == user.id).order_by(Deal.updated_at.desc()).limit(50).all()
-    return [
-        {
-            "id": d.id,
-            "customer_token": d.customer_token,
-            "status": d.status.value,
-            "preference": json.loads(d.preference_json or "{}"),
-            "updated_at": d.updated_at.isoformat(),
-        }
-        for d in qs
-    ]
+async def list_deals(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated, e.g. id,status,updated_at,preference"),
+    db: AsyncSession = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    wanted = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(DEFAULT_FIELDS)
+    unknown = [f for f in wanted if f not in DEAL_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    # (owner_user_id, updated_at, id) index: owner-scoped range scan, newest first
+    stmt = select(Deal.id, Deal.updated_at, *(DEAL_FIELDS[f] for f in wanted if f not in ("id", "updated_at")))
+    stmt = stmt.where(Deal.owner_user_id == user.id)
+    if cursor:
+        ts, last_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Deal.updated_at, Deal.id) < tuple_(ts, last_id))
+    stmt = stmt.order_by(Deal.updated_at.desc(), Deal.id.desc()).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).mappings().all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1]["updated_at"], page[-1]["id"]) if len(rows) > limit else None
+    return {
+        "items": [{f: _render(f, r[DEAL_FIELDS[f].key]) for f in wanted} for r in page],
+        "next_cursor": next_cursor,
+    }
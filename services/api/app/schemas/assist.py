@@ -3,6 +3,8 @@ from pydantic import BaseModel, Field
 
 class AssistRequest(BaseModel):
     deal_id: int | None = None
+    # client conversation id; anonymous messages with the same id share one deal
+    session_id: str | None = Field(None, max_length=128)
     message: str = Field(..., min_length=1)
 
 
@@ -1,16 +1,27 @@
+import asyncio
 import json
+import logging
+from collections.abc import AsyncIterator
+from datetime import datetime
 from typing import Any
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.metrics import timed
 from app.models.artifact import Artifact, ArtifactType
 from app.models.audit_log import AuditLog
 from app.models.deal import Deal
-from app.models.user import User
+from app.services.deal_resolver import DealResolver, deal_resolver
 from app.services.intent_router import classify
-from app.services.mcp_client import McpClient
+from app.services.mcp_client import McpClient, mcp_client
+from app.services.persister import WriteBehindPersister, persister
+from app.utils.principal_cache import Principal
 
 
+log = logging.getLogger("dealermate")
+
 OUT_OF_SCOPE_MESSAGE = (
     "딜러메이트는 차량 상담·추천·비교·리스크·가격/협상·팔로업 등 업무 질문만 도와드립니다.\n"
     "차량번호 또는 고객 조건(예산/차종/금기사항)을 입력해 주세요."
@@ -18,33 +29,73 @@ OUT_OF_SCOPE_MESSAGE = (
 
 
 class AssistantService:
-    def __init__(self) -> None:
-        self.mcp = McpClient()
+    def __init__(
+        self,
+        mcp: McpClient | None = None,
+        writer: WriteBehindPersister | None = None,
+        deals: DealResolver | None = None,
+    ) -> None:
+        self.mcp = mcp or mcp_client
+        self.writer = writer or persister
+        self.deals = deals or deal_resolver
+
+    async def assist(
+        self, db: AsyncSession, user: Principal, message: str, deal_id: int | None = None, session_id: str | None = None
+    ) -> dict[str, Any]:
+        response: dict[str, Any] = {}
+        # drain the whole stream: persistence runs after the final "result" event
+        async for event, data in self.events(db, user, message, deal_id=deal_id, session_id=session_id):
+            if event == "result":
+                response = data
+        return response
 
-    async def assist(self, db: Session, user: User, message: str, deal_id: int | None = None) -> dict[str, Any]:
-        intent = classify(message)
+    async def events(
+        self,
+        db: AsyncSession,
+        user: Principal,
+        message: str,
+        deal_id: int | None = None,
+        session_id: str | None = None,
+        incremental: bool = False,
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Assist as a sequence of ``(event, data)`` pairs.
+
+        ``intent`` first, then ``deal``, one ``tool`` event per tool result, and finally
+        ``result`` (the full ``assist()`` response). Artifact/audit rows are queued after
+        ``result``, so consumers must iterate to the end. With ``incremental`` the risk
+        lookups are issued as separate calls and reported as each one completes instead
+        of as one batch.
+        """
+        with timed("classify"):
+            intent = classify(message)
         used_tools: list[str] = []
+        yield "intent", {"intent": intent}
 
         if intent == "out_of_scope":
-            return {
+            yield "result", {
                 "intent": intent,
                 "used_tools": used_tools,
                 "result": {"type": "out_of_scope", "text": OUT_OF_SCOPE_MESSAGE},
             }
+            return
 
-        deal = None
-        if deal_id is not None:
-            deal = db.query(Deal).filter(Deal.id == deal_id, Deal.owner_user_id == user.id).first()
+        with timed("deal"):
+            deal = None
+            if deal_id is not None:
+                stmt = select(Deal.id, Deal.customer_token).where(Deal.id == deal_id, Deal.owner_user_id == user.id)
+                deal = (await db.execute(stmt)).first()
 
-        # If no deal, create an anonymous customer token deal for continuity
-        if deal is None:
-            deal = Deal(owner_user_id=user.id, customer_token=f"CST-{user.id}-{abs(hash(message))%99999}")
-            db.add(deal)
-            db.commit()
-            db.refresh(deal)
+            # If no deal, reuse the anonymous customer deal of this conversation; without a
+            # session key every conversation starts its own deal (never one per login)
+            if deal is None and session_id:
+                deal = await self.deals.resolve(db, user, session_id)
+            elif deal is None:
+                deal = await self.deals.create(db, user)
+        deal_id, customer_token = deal
+        yield "deal", {"deal_id": deal_id, "customer_token": customer_token}
 
         # Tooling decisions (MVP-grade)
-        payload: dict[str, Any] = {"deal_id": deal.id, "customer_token": deal.customer_token}
+        payload: dict[str, Any] = {"deal_id": deal_id, "customer_token": customer_token}
 
         if intent == "recommend":
             used_tools.append("inventory.search_listings")
@@ -53,35 +104,52 @@ class AssistantService:
                 {"query": message, "top_k": 3, "branch_id": user.branch_id, "dealer_employee_id": user.employee_id},
             )
             payload["recommendations"] = tool_res.get("data")
+            yield "tool", {"key": "recommendations", "tool": "inventory.search_listings", "ok": True, "data": payload["recommendations"]}
             payload["summary"] = "조건에 맞는 매물을 3개로 정제해 추천했습니다."
 
         elif intent == "risk":
             used_tools += ["inventory.get_car_by_plate", "history.get_vehicle_registry_summary", "history.get_maintenance_history"]
             # naive plate extraction
             plate = self._extract_plate(message) or "12가3456"
-            car = await self.mcp.call_tool(
-                "inventory.get_car_by_plate",
-                {"plate": plate, "branch_id": user.branch_id, "dealer_employee_id": user.employee_id},
-            )
-            car_data = car.get("data") or {}
-            registry = await self.mcp.call_tool("history.get_vehicle_registry_summary", {"plate": plate})
-            maint = await self.mcp.call_tool("history.get_maintenance_history", {"plate": plate})
+            calls = {
+                "car": ("inventory.get_car_by_plate", {"plate": plate, "branch_id": user.branch_id, "dealer_employee_id": user.employee_id}),
+                "registry": ("history.get_vehicle_registry_summary", {"plate": plate}),
+                "maintenance": ("history.get_maintenance_history", {"plate": plate}),
+            }
+            if incremental:
+                # separate calls so each result can be shown as soon as it lands
+                results, failed = {}, set()
+                async for key, ok, data in self._stream_tools(calls, deadline=settings.assist_fanout_deadline):
+                    results[key] = data
+                    if not ok:
+                        failed.add(key)
+                    yield "tool", {"key": key, "tool": calls[key][0], "ok": ok, "data": data}
+                missing = [k for k in calls if k in failed]
+            else:
+                # independent lookups: one batched round-trip, fanned out by the orchestrator under one deadline
+                results, missing = await self._call_tools_concurrently(calls, deadline=settings.assist_fanout_deadline)
+                for key, (tool, _) in calls.items():
+                    yield "tool", {"key": key, "tool": tool, "ok": key not in missing, "data": results[key]}
+            car_data = results["car"] or {"plate": plate}
 
             payload["car"] = car_data
-            payload["registry"] = registry.get("data")
-            payload["maintenance"] = maint.get("data")
-            payload["briefing"] = self._make_risk_briefing(car_data, registry.get("data"), maint.get("data"))
+            payload["registry"] = results["registry"]
+            payload["maintenance"] = results["maintenance"]
+            with timed("briefing"):
+                payload["briefing"] = self._make_risk_briefing(car_data, results["registry"], results["maintenance"], missing=missing)
 
         elif intent == "pricing":
             used_tools.append("pricing.get_market_price")
             tool_res = await self.mcp.call_tool("pricing.get_market_price", {"query": message})
             payload["pricing"] = tool_res.get("data")
+            yield "tool", {"key": "pricing", "tool": "pricing.get_market_price", "ok": True, "data": payload["pricing"]}
             payload["summary"] = "최근 3개월 시세 범위와 현재 포지션을 요약했습니다."
 
         elif intent == "compare":
             used_tools.append("inventory.compare_listings")
-            tool_res = await self.mcp.call_tool("inventory.compare_listings", {"query": message, "top_k": 3})
+            tool_res = await self.mcp.call_tool("inventory.compare_listings", {"query": message, "top_k": 3, "branch_id": user.branch_id})
             payload["compare"] = tool_res.get("data")
+            yield "tool", {"key": "compare", "tool": "inventory.compare_listings", "ok": True, "data": payload["compare"]}
             payload["summary"] = "핵심 차이점과 비교표를 생성했습니다."
 
         elif intent == "followup":
@@ -102,30 +170,95 @@ class AssistantService:
             used_tools.append("boss.get_monthly_sales_stats")
             tool_res = await self.mcp.call_tool("boss.get_monthly_sales_stats", {"branch_id": user.branch_id, "range_months": 6})
             payload["kpi"] = tool_res.get("data")
+            yield "tool", {"key": "kpi", "tool": "boss.get_monthly_sales_stats", "ok": True, "data": payload["kpi"]}
             payload["summary"] = "최근 판매 현황과 KPI 요약을 가져왔습니다."
 
-        # Persist artifact (latest response snapshot)
-        artifact = Artifact(
-            deal_id=deal.id,
-            owner_user_id=user.id,
-            type=ArtifactType.briefing,
-            title=f"{intent} response",
-            content=json.dumps(payload, ensure_ascii=False),
-        )
-        db.add(artifact)
-
-        # audit
-        audit = AuditLog(
-            actor_user_id=user.id,
-            action="assist",
-            resource="assistant",
-            request_json=json.dumps({"message": message, "intent": intent, "used_tools": used_tools}, ensure_ascii=False),
-            response_json=json.dumps(payload, ensure_ascii=False),
-        )
-        db.add(audit)
-        db.commit()
-
-        return {"intent": intent, "used_tools": used_tools, "result": payload}
+        yield "result", {"intent": intent, "used_tools": used_tools, "result": payload}
+
+        # Persist artifact (latest response snapshot) + audit, write-behind
+        with timed("persist"):
+            now = datetime.utcnow()
+            payload_json = json.dumps(payload, ensure_ascii=False)
+            await self.writer.add(
+                (
+                    Artifact,
+                    {
+                        "deal_id": deal_id,
+                        "owner_user_id": user.id,
+                        "type": ArtifactType.briefing,
+                        "title": f"{intent} response",
+                        "content": payload_json,
+                        "created_at": now,
+                    },
+                ),
+                (
+                    AuditLog,
+                    {
+                        "actor_user_id": user.id,
+                        "action": "assist",
+                        "resource": "assistant",
+                        "request_json": json.dumps({"message": message, "intent": intent, "used_tools": used_tools}, ensure_ascii=False),
+                        "response_json": payload_json,
+                        "created_at": now,
+                    },
+                ),
+            )
+
+    async def _call_tools_concurrently(
+        self, calls: dict[str, tuple[str, dict[str, Any]]], deadline: float
+    ) -> tuple[dict[str, Any], list[str]]:
+        """Run independent tool calls as one orchestrator batch, bounded by one overall deadline.
+
+        Returns ``(results, missing)``: ``results`` maps each key to the tool's ``data``
+        (``None`` when the call failed or missed the deadline), ``missing`` lists those keys.
+        """
+        keys = list(calls)
+        try:
+            entries = await self.mcp.call_batch([calls[k] for k in keys], deadline=deadline)
+        except Exception as e:
+            log.warning("tool batch failed: %s", type(e).__name__)
+            entries = [{"tool": calls[k][0], "status": "error", "error": type(e).__name__} for k in keys]
+
+        results: dict[str, Any] = {}
+        missing: list[str] = []
+        for key, entry in zip(keys, entries):
+            if entry.get("status") == "ok":
+                results[key] = (entry.get("result") or {}).get("data")
+                continue
+            log.warning("tool call %s: %s (%s)", entry.get("status"), entry.get("tool"), entry.get("error"))
+            results[key] = None
+            missing.append(key)
+        return results, missing
+
+    async def _stream_tools(
+        self, calls: dict[str, tuple[str, dict[str, Any]]], deadline: float
+    ) -> AsyncIterator[tuple[str, bool, Any]]:
+        """Run independent tool calls concurrently and yield ``(key, ok, data)`` in completion order.
+
+        Calls still running at the deadline are cancelled and reported as failed.
+        """
+        tasks = {asyncio.ensure_future(self.mcp.call_tool(tool, args)): key for key, (tool, args) in calls.items()}
+        loop = asyncio.get_running_loop()
+        until = loop.time() + deadline
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, until - loop.time()), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    key = tasks[task]
+                    if task.exception() is not None:
+                        log.warning("tool call error: %s (%s)", calls[key][0], type(task.exception()).__name__)
+                        yield key, False, None
+                    else:
+                        yield key, True, (task.result() or {}).get("data")
+            for task in pending:
+                log.warning("tool call timeout: %s", calls[tasks[task]][0])
+                yield tasks[task], False, None
+        finally:
+            for task in pending:
+                task.cancel()
 
     def _extract_plate(self, message: str) -> str | None:
         # very loose Korean plate extractor (demo)
@@ -134,9 +267,16 @@ class AssistantService:
         m = re.search(r"\b\d{2,3}[가-힣]\d{4}\b", message)
         return m.group(0) if m else None
 
-    def _make_risk_briefing(self, car: dict[str, Any], registry: dict[str, Any] | None, maintenance: dict[str, Any] | None) -> dict[str, Any]:
+    def _make_risk_briefing(
+        self,
+        car: dict[str, Any],
+        registry: dict[str, Any] | None,
+        maintenance: dict[str, Any] | None,
+        missing: list[str] | None = None,
+    ) -> dict[str, Any]:
         reg = registry or {}
         maint = maintenance or {}
+        missing = missing or []
         points = []
 
         if reg.get("owner_changes") is not None:
@@ -146,10 +286,19 @@ class AssistantService:
         if maint.get("total_records") is not None:
             points.append(f"정비 이력: {maint['total_records']}건")
 
+        next_actions = ["성능기록부 확인", "정비이력 주요 항목 체크", "시세 대비 가격 포지션 확인"]
+        if missing:
+            labels = {"car": "차량정보", "registry": "원부", "maintenance": "정비이력"}
+            unavailable = ", ".join(labels.get(k, k) for k in missing)
+            points.append(f"일부 조회 실패({unavailable}) - 재조회 필요")
+            next_actions.insert(0, f"{unavailable} 재조회")
+
         return {
             "summary": " / ".join(points) or "추가 조회 데이터가 제한적입니다. 원부/정비/성능을 확인해 고지 포인트를 정리하세요.",
             "disclosure_script": "확인된 이력 기준으로 투명하게 안내드리고, 성능기록부/정비이력 기준으로 상태를 함께 확인해드리겠습니다.",
-            "next_actions": ["성능기록부 확인", "정비이력 주요 항목 체크", "시세 대비 가격 포지션 확인"],
+            "next_actions": next_actions,
+            "degraded": bool(missing),
+            "missing_sources": missing,
             "car_snapshot": {
                 "plate": car.get("plate"),
                 "model": car.get("model"),
@@ -0,0 +1,89 @@
+import hashlib
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.deal import RESOLVED_TOKEN_WHERE, Deal
+from app.utils.principal_cache import Principal
+
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def customer_token_for(user_id: int, session_key: str) -> str:
+    """Stable anonymous customer token for one conversation (same on every worker)."""
+    digest = hashlib.sha256(f"{user_id}:{session_key}".encode("utf-8")).hexdigest()[:24]
+    return f"CST-{user_id}-{digest}"
+
+
+class DealResolver:
+    """Maps a dealer's conversation to its Deal without inserting a row per message.
+
+    The customer token is a digest of ``(user id, session key)``; the row is created at
+    most once via ``INSERT .. ON CONFLICT DO NOTHING`` on ``(owner_user_id, customer_token)``
+    and the resulting id is kept in a per-process LRU, so follow-up messages cost no
+    database round-trip at all. Ids whose dependent rows were rejected (e.g. the deal was
+    deleted) are dropped with ``forget()`` and resolved again on the next message.
+    """
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        # cleared at startup when the unique (owner_user_id, customer_token) index is missing:
+        # ON CONFLICT needs it, so rows are then inserted after a plain lookup
+        self.upsert = True
+        self._ids: OrderedDict[tuple[int, str], int] = OrderedDict()
+
+    async def resolve(self, db: AsyncSession, user: Principal, session_key: str) -> tuple[int, str]:
+        token = customer_token_for(user.id, session_key)
+        key = (user.id, token)
+        deal_id = self._ids.get(key)
+        if deal_id is None:
+            deal_id = await self._upsert(db, user.id, token)
+            self._ids[key] = deal_id
+            while len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+        else:
+            self._ids.move_to_end(key)
+        return deal_id, token
+
+    async def create(self, db: AsyncSession, user: Principal) -> tuple[int, str]:
+        """A new anonymous deal for a conversation without a session key (not cached)."""
+        token = customer_token_for(user.id, f"anon:{uuid.uuid4().hex}")
+        return await self._upsert(db, user.id, token), token
+
+    def forget(self, deal_ids: Iterable[int | None]) -> None:
+        stale = set(deal_ids)
+        for key in [k for k, v in self._ids.items() if v in stale]:
+            del self._ids[key]
+
+    async def _upsert(self, db: AsyncSession, owner_user_id: int, token: str) -> int:
+        lookup = select(Deal.id).where(Deal.owner_user_id == owner_user_id, Deal.customer_token == token)
+        deal_id = (await db.execute(lookup)).scalar_one_or_none()
+        if deal_id is not None:
+            return deal_id
+
+        dialect_insert = _UPSERT_DIALECTS.get(db.bind.dialect.name) if self.upsert else None
+        if dialect_insert is None:
+            deal = Deal(owner_user_id=owner_user_id, customer_token=token)
+            db.add(deal)
+            await db.commit()
+            return deal.id
+
+        stmt = (
+            dialect_insert(Deal)
+            .values(owner_user_id=owner_user_id, customer_token=token)
+            .on_conflict_do_nothing(index_elements=["owner_user_id", "customer_token"], index_where=RESOLVED_TOKEN_WHERE)
+            .returning(Deal.id)
+        )
+        deal_id = (await db.execute(stmt)).scalar_one_or_none()
+        await db.commit()
+        if deal_id is None:
+            # lost the race to another worker: the row exists now
+            deal_id = (await db.execute(lookup)).scalar_one()
+        return deal_id
+
+
+deal_resolver = DealResolver()
@@ -1,4 +1,4 @@
-import re
+from collections.abc import Iterable
 
 INTENTS = [
     "recommend",
@@ -11,31 +11,120 @@ INTENTS = [
     "out_of_scope",
 ]
 
+DEFAULT_INTENT = "recommend"
 
-_OUT_OF_SCOPE_PAT = re.compile(r"(배고파|날씨|주식|연애|농담|게임|점심|저녁)")
+# Keywords per intent, in priority order: the first intent with any keyword anywhere in
+# the message wins (out_of_scope first). A keyword that ends inside a longer keyword at the
+# same position is shadowed by it ("지표" is kpi, not compare via "표"). Matching is on the
+# lowercased message with whitespace runs collapsed to one space ("top 3" covers "top  3").
+INTENT_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "out_of_scope": ("배고파", "날씨", "주식", "연애", "농담", "게임", "점심", "저녁"),
+    "recommend": ("추천", "매물", "조건", "suv", "sedan", "top3", "top 3", "3대"),
+    "compare": ("비교", "vs", "차이", "표"),
+    "risk": ("리스크", "사고", "성능", "정비", "원부", "침수", "교환"),
+    "pricing": ("시세", "가격", "포지션", "얼마", "market", "price"),
+    "negotiation": ("협상", "할인", "깎", "양보", "방어가", "제시가", "네고"),
+    "followup": ("팔로업", "카톡", "문자", "메시지", "follow"),
+    "kpi": ("판매현황", "kpi", "장기재고", "에이징", "지표"),
+}
+
+# message separator for classify_many (never part of a keyword)
+_SEP = "\x00"
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over all intent keywords, compiled to a DFA.
+
+    ``delta[state]`` maps a character to the next state (characters that are not in
+    any keyword return to the root); ``best[state]`` is the intent rank of the longest
+    keyword ending in that state (its own keyword, else the one reached via suffix links).
+    One scan costs one dict lookup per character regardless of how many keywords exist.
+    """
+
+    def __init__(self, keywords: dict[str, tuple[str, ...]]) -> None:
+        self.intents = list(keywords)
+        self.none = len(self.intents)
+        goto: list[dict[str, int]] = [{}]
+        best = [self.none]
+        for rank, intent in enumerate(self.intents):
+            for kw in keywords[intent]:
+                state = 0
+                for ch in kw:
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][ch] = nxt
+                        goto.append({})
+                        best.append(self.none)
+                    state = nxt
+                best[state] = min(best[state], rank)
+
+        # BFS: suffix links, inherited outputs and the full transition table
+        fail = [0] * len(goto)
+        delta: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = list(goto[0].values())
+        i = 0
+        while i < len(queue):
+            s = queue[i]
+            i += 1
+            if best[s] == self.none:
+                best[s] = best[fail[s]]
+            delta[s] = dict(delta[fail[s]])
+            for ch, nxt in goto[s].items():
+                delta[s][ch] = nxt
+                fail[nxt] = delta[fail[s]].get(ch, 0)
+                queue.append(nxt)
+        self.delta = delta
+        self.best = best
+
+    def scan(self, text: str) -> int:
+        """Best intent rank in ``text`` (``self.none`` if no keyword matches)."""
+        delta, best = self.delta, self.best
+        state, rank = 0, self.none
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if best[state] < rank:
+                rank = best[state]
+                if not rank:
+                    break
+        return rank
+
+    def scan_many(self, text: str, sep: str) -> list[int]:
+        """Best rank per ``sep``-separated segment of ``text`` in one pass."""
+        delta, best, none = self.delta, self.best, self.none
+        out: list[int] = []
+        state, rank = 0, none
+        for ch in text:
+            if ch == sep:
+                out.append(rank)
+                state, rank = 0, none
+                continue
+            state = delta[state].get(ch, 0)
+            r = best[state]
+            if r < rank:
+                rank = r
+        out.append(rank)
+        return out
+
+
+_AUTOMATON = KeywordAutomaton(INTENT_KEYWORDS)
+
+
+def _normalize(message: str) -> str:
+    return " ".join(message.lower().split())
+
+
+def _intent_of(rank: int) -> str:
+    return DEFAULT_INTENT if rank == _AUTOMATON.none else _AUTOMATON.intents[rank]
 
 
 def classify(message: str) -> str:
-    m = message.strip().lower()
-
-    if _OUT_OF_SCOPE_PAT.search(message):
-        return "out_of_scope"
-
-    # intent keywords (Korean + English-ish)
-    if re.search(r"(추천|매물|조건|suv|sedan|top\s*3|3대)", m):
-        return "recommend"
-    if re.search(r"(비교|vs|차이|표)", m):
-        return "compare"
-    if re.search(r"(리스크|사고|성능|정비|원부|침수|교환)", m):
-        return "risk"
-    if re.search(r"(시세|가격|포지션|얼마|market|price)", m):
-        return "pricing"
-    if re.search(r"(협상|할인|깎|양보|방어가|제시가)", m):
-        return "negotiation"
-    if re.search(r"(팔로업|카톡|문자|메시지|follow)", m):
-        return "followup"
-    if re.search(r"(판매현황|kpi|장기재고|에이징|지표)", m):
-        return "kpi"
-
-    # default: recommend-like
-    return "recommend"
+    return _intent_of(_AUTOMATON.scan(_normalize(message)))
+
+
+def classify_many(messages: Iterable[str]) -> list[str]:
+    """Classify a batch with a single scan over the joined, normalized messages."""
+    texts = [_normalize(m).replace(_SEP, " ") for m in messages]
+    if not texts:
+        return []
+    return [_intent_of(r) for r in _AUTOMATON.scan_many(_SEP.join(texts), _SEP)]
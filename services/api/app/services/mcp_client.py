@@ -1,16 +1,88 @@
+import importlib.util
 from typing import Any
 
 import httpx
 
 from app.core.config import settings
+from app.core.metrics import observe, timed
+
+
+def _http2_available() -> bool:
+    # httpx only speaks HTTP/2 when the optional `h2` package is installed
+    return importlib.util.find_spec("h2") is not None
 
 
 class McpClient:
+    """Thin client for the MCP orchestrator.
+
+    A single pooled `httpx.AsyncClient` is shared for the whole process so that
+    tool calls reuse keep-alive connections instead of reconnecting every time.
+    The client is opened/closed with the FastAPI app lifecycle (see app.main).
+    """
+
     def __init__(self) -> None:
         self.base_url = settings.mcp_orch_url.rstrip("/")
+        self._client: httpx.AsyncClient | None = None
+
+    def _build_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=settings.mcp_http2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=settings.mcp_pool_max_connections,
+                max_keepalive_connections=settings.mcp_pool_max_keepalive,
+                keepalive_expiry=settings.mcp_pool_keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(
+                settings.mcp_read_timeout,
+                connect=settings.mcp_connect_timeout,
+                pool=settings.mcp_pool_timeout,
+            ),
+        )
+
+    async def start(self) -> None:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Lazily open the pool if a call arrives before startup (e.g. scripts/tests)
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
 
     async def call_tool(self, tool: str, args: dict[str, Any]) -> dict[str, Any]:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            r = await client.post(f"{self.base_url}/tool/call", json={"tool": tool, "args": args})
+        with timed("tool", tool):
+            r = await self.client.post("/tool/call", json={"tool": tool, "args": args})
             r.raise_for_status()
             return r.json()
+
+    async def call_batch(self, calls: list[tuple[str, dict[str, Any]]], deadline: float | None = None) -> list[dict[str, Any]]:
+        """Send several tool calls in one round-trip (orchestrator ``/tool/batch``).
+
+        Returns per-call entries in request order: ``{"tool", "status", "latency_ms", "result" | "error"}``.
+        """
+        body: dict[str, Any] = {"calls": [{"tool": t, "args": a} for t, a in calls]}
+        timeout = self.client.timeout
+        if deadline is not None:
+            body["deadline_ms"] = int(deadline * 1000)
+            # leave the orchestrator room to answer with partial results
+            timeout = httpx.Timeout(deadline + 1.0, connect=settings.mcp_connect_timeout, pool=settings.mcp_pool_timeout)
+        with timed("tool", "batch"):
+            r = await self.client.post("/tool/batch", json=body, timeout=timeout)
+            r.raise_for_status()
+            results = r.json()["results"]
+        # per-call latency as measured by the orchestrator
+        for entry in results:
+            if entry.get("latency_ms") is not None:
+                observe("tool", entry["latency_ms"] / 1000, entry.get("tool", ""))
+        return results
+
+
+# Process-wide shared client
+mcp_client = McpClient()
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import timed
+from app.db.base import Base
+from app.db.session import SessionLocal
+
+log = logging.getLogger("dealermate")
+
+Row = tuple[type[Base], dict[str, Any]]
+
+
+class WriteBehindPersister:
+    """Write-behind buffer for append-only rows (Artifact / AuditLog).
+
+    Request handlers ``add()`` plain column dicts and return without touching the
+    database. A background task flushes the bounded queue as one transaction with a
+    multi-row INSERT per table, when ``batch_size`` rows are waiting or every
+    ``flush_interval`` seconds.
+
+    - Backpressure: ``add()`` waits up to ``put_timeout`` for queue space and then writes
+      the rows inline, so nothing is dropped while the flusher is behind.
+    - Durability: a failed batch is retried up to ``max_attempts`` times, then bisected
+      to isolate the rows that fail on their own; those are logged and appended to
+      ``dead_letter_path`` so one bad row cannot stall the queue. ``stop()`` drains and
+      flushes everything still queued before the engine is disposed.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        queue_size: int = 5000,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        put_timeout: float = 2.0,
+        retry_interval: float = 1.0,
+        max_attempts: int = 3,
+        dead_letter_path: str = "/tmp/dealermate-dead-letter.jsonl",
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.retry_interval = retry_interval
+        self.max_attempts = max_attempts
+        self.dead_letter_path = dead_letter_path
+        self.queue: asyncio.Queue[Row] = asyncio.Queue(maxsize=queue_size)
+        self._task: asyncio.Task | None = None
+        self._inflight: list[Row] = []
+        # called with the dead-lettered rows and the error, e.g. to drop cached foreign keys
+        self.on_dead_letter: list[Callable[[list[Row], Exception], None]] = []
+        self._stats = {"queued": 0, "flushed": 0, "commits": 0, "inline": 0, "errors": 0, "dead_lettered": 0}
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # the batch the flusher was holding when cancelled comes first
+        batch, self._inflight = self._inflight, []
+        while batch or not self.queue.empty():
+            await self._write(batch or self._drain(self.batch_size))
+            batch = []
+
+    async def add(self, *rows: Row) -> None:
+        if self._task is None:
+            # not started (scripts/tests): behave like a plain insert
+            await self._write_inline(list(rows))
+            return
+        for i, row in enumerate(rows):
+            try:
+                await asyncio.wait_for(self.queue.put(row), timeout=self.put_timeout)
+                self._stats["queued"] += 1
+            except asyncio.TimeoutError:
+                await self._write_inline(list(rows[i:]))
+                return
+
+    async def _write_inline(self, rows: list[Row]) -> None:
+        # runs inside the request: one attempt, failures are dead-lettered, never raised
+        self._stats["inline"] += len(rows)
+        await self._write(rows, attempts=1)
+
+    def _drain(self, limit: int) -> list[Row]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            self._inflight = [await self.queue.get()]
+            if self.queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.flush_interval)
+            self._inflight += self._drain(self.batch_size - 1)
+            await self._write(self._inflight)
+            self._inflight = []
+
+    async def _write(self, batch: list[Row], attempts: int | None = None) -> None:
+        """Flush ``batch`` with bounded retries, bisecting it to dead-letter bad rows."""
+        if not batch:
+            return
+        attempts = attempts or self.max_attempts
+        for attempt in range(attempts):
+            error = await self._flush(batch)
+            if error is None:
+                return
+            # constraint / value errors fail again on retry: go straight to bisection
+            if isinstance(error, (IntegrityError, DataError)) or attempt == attempts - 1:
+                break
+            await asyncio.sleep(self.retry_interval)
+        if len(batch) == 1:
+            self._dead_letter(batch, error)
+            return
+        mid = len(batch) // 2
+        await self._write(batch[:mid], attempts=1)
+        await self._write(batch[mid:], attempts=1)
+
+    def _dead_letter(self, rows: list[Row], error: Exception) -> None:
+        self._stats["dead_lettered"] += len(rows)
+        log.error("write-behind dropped %d rows after %s", len(rows), type(error).__name__)
+        for callback in self.on_dead_letter:
+            callback(rows, error)
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as fp:
+                for model, values in rows:
+                    record = {"table": model.__tablename__, "error": type(error).__name__, "values": values}
+                    fp.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError:
+            log.exception("could not write %d rows to %s", len(rows), self.dead_letter_path)
+
+    async def _flush(self, batch: list[Row]) -> Exception | None:
+        """One transaction for ``batch``; returns the error instead of raising it."""
+        if not batch:
+            return None
+        by_model: dict[type[Base], list[dict[str, Any]]] = defaultdict(list)
+        for model, values in batch:
+            by_model[model].append(values)
+        try:
+            with timed("persist_flush"):
+                async with self.session_factory() as db:
+                    for model, values in by_model.items():
+                        # executemany on insert() -> multi-row INSERT ... VALUES (...), (...)
+                        await db.execute(insert(model), values)
+                    await db.commit()
+        except Exception as e:
+            self._stats["errors"] += 1
+            log.warning("write-behind flush failed (%s), %d rows", type(e).__name__, len(batch))
+            return e
+        self._stats["flushed"] += len(batch)
+        self._stats["commits"] += 1
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._stats, "pending": self.queue.qsize()}
+
+
+persister = WriteBehindPersister(
+    SessionLocal,
+    queue_size=settings.persist_queue_size,
+    batch_size=settings.persist_batch_size,
+    flush_interval=settings.persist_flush_interval,
+    put_timeout=settings.persist_put_timeout,
+    max_attempts=settings.persist_max_attempts,
+    dead_letter_path=settings.persist_dead_letter_path,
+)
@@ -1,20 +1,28 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
 from app.models.user import User
+from app.utils.principal_cache import Principal, principal_cache
 from app.utils.security import decode_token
 
 bearer = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
+async def get_current_user(
     cred: HTTPAuthorizationCredentials | None = Depends(bearer),
-    db: Session = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
     if cred is None:
         raise HTTPException(status_code=401, detail="Missing Authorization header")
+
+    # repeated requests from the same session skip signature verification and the user lookup
+    cached = principal_cache.get(cred.credentials)
+    if cached is not None:
+        return cached
+
     try:
         payload = decode_token(cred.credentials)
     except Exception:
@@ -24,14 +32,16 @@ def get_current_user(
     if not employee_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.employee_id == employee_id).first()
+    user = (await db.execute(select(User).where(User.employee_id == employee_id))).scalar_one_or_none()
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="User not found or inactive")
-    return user
+    principal = Principal.from_user(user, payload)
+    principal_cache.put(cred.credentials, principal)
+    return principal
 
 
 def require_role(*roles: str):
-    def _inner(user: User = Depends(get_current_user)) -> User:
+    def _inner(user: Principal = Depends(get_current_user)) -> Principal:
         if user.role.value not in roles:
             raise HTTPException(status_code=403, detail="Forbidden")
         return user
@@ -0,0 +1,101 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.models.user import Role, User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated caller: the verified token claims plus the user fields routes need."""
+
+    id: int
+    employee_id: str
+    name: str
+    branch_id: str
+    role: Role
+    is_active: bool
+    claims: dict[str, Any]
+
+    @classmethod
+    def from_user(cls, user: User, claims: dict[str, Any]) -> "Principal":
+        return cls(
+            id=user.id,
+            employee_id=user.employee_id,
+            name=user.name,
+            branch_id=user.branch_id,
+            role=user.role,
+            is_active=user.is_active,
+            claims=claims,
+        )
+
+
+class PrincipalCache:
+    """Per-process LRU of verified tokens -> ``Principal``.
+
+    Keyed by the SHA-256 of the raw bearer token (tokens themselves are never stored).
+    An entry lives for ``ttl`` seconds but never past the token's ``exp``, and is
+    dropped as soon as the user row changes in this process (e.g. deactivation);
+    other workers pick such changes up within ``ttl``.
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Principal | None:
+        if self.ttl <= 0:
+            return None
+        key = self.key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+            del self._entries[key]
+        self._stats["misses"] += 1
+        return None
+
+    def put(self, token: str, principal: Principal) -> None:
+        if self.ttl <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        exp = principal.claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        key = self.key(token)
+        self._entries[key] = (expires_at, principal)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def evict_user(self, employee_id: str) -> int:
+        keys = [k for k, (_, p) in self._entries.items() if p.employee_id == employee_id]
+        for k in keys:
+            del self._entries[k]
+        self._stats["evictions"] += len(keys)
+        return len(keys)
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._stats, "entries": len(self._entries), "ttl": self.ttl}
+
+
+principal_cache = PrincipalCache(ttl=settings.auth_cache_ttl, max_entries=settings.auth_cache_max_entries)
+
+
+@event.listens_for(User, "after_update")
+def _evict_updated_user(mapper, connection, target: User) -> None:
+    # role/branch/is_active changes must not be served from a stale principal
+    principal_cache.evict_user(target.employee_id)
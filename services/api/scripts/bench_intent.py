@@ -0,0 +1,112 @@
+"""Accuracy and per-message cost of the intent classifier on the labeled corpus.
+
+Compares the legacy chain of per-intent ``re.search`` calls with the keyword automaton
+(``classify`` / ``classify_many``), lists where they disagree, and shows how each
+scales when the keyword lists grow. Run from services/api:
+
+    python -m scripts.bench_intent [--repeat 200] [--grow 0 50 200 1000]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from collections import Counter
+from pathlib import Path
+
+from app.services.intent_router import DEFAULT_INTENT, INTENT_KEYWORDS, KeywordAutomaton, classify, classify_many
+
+CORPUS = Path(__file__).with_name("intent_corpus.tsv")
+
+
+def load_corpus(path: Path = CORPUS) -> list[tuple[str, str]]:
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip() and not line.startswith("#"):
+            label, message = line.split("\t", 1)
+            rows.append((label, message))
+    return rows
+
+
+def legacy_classifier(keywords: dict[str, tuple[str, ...]]):
+    """The previous implementation: one regex per intent, tried in priority order."""
+    pats = [(intent, re.compile("(" + "|".join(re.escape(k).replace(r"\ ", r"\s*") for k in kws) + ")")) for intent, kws in keywords.items()]
+
+    def _classify(message: str) -> str:
+        m = message.strip().lower()
+        for intent, pat in pats:
+            if pat.search(m):
+                return intent
+        return DEFAULT_INTENT
+
+    return _classify
+
+
+def grown(extra: int, seed: int = 11) -> dict[str, tuple[str, ...]]:
+    """Keyword lists with ``extra`` synthetic (non-matching) keywords added per intent."""
+    rnd = random.Random(seed)
+    syllables = [chr(c) for c in range(0xAC00, 0xD7A4, 97)]
+    return {
+        intent: kws + tuple("".join(rnd.choice(syllables) for _ in range(3)) for _ in range(extra))
+        for intent, kws in INTENT_KEYWORDS.items()
+    }
+
+
+def per_message_us(fn, messages: list[str], repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for m in messages:
+            fn(m)
+    return (time.perf_counter() - t0) / (repeat * len(messages)) * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--grow", type=int, nargs="+", default=[0, 50, 200, 1000])
+    args = ap.parse_args()
+
+    corpus = load_corpus()
+    labels = [label for label, _ in corpus]
+    messages = [message for _, message in corpus]
+
+    legacy = legacy_classifier(INTENT_KEYWORDS)
+    predicted = [classify(m) for m in messages]
+    legacy_predicted = [legacy(m) for m in messages]
+    assert classify_many(messages) == predicted
+
+    correct = sum(p == label for p, label in zip(predicted, labels))
+    legacy_correct = sum(p == label for p, label in zip(legacy_predicted, labels))
+    print(f"corpus: {len(corpus)} messages, accuracy {correct / len(corpus):.1%} (legacy {legacy_correct / len(corpus):.1%})")
+    for m, p, lp in zip(messages, predicted, legacy_predicted):
+        if p != lp:
+            print(f"  changed: {m!r} {lp} -> {p}")
+    errors = Counter((label, p) for p, label in zip(predicted, labels) if p != label)
+    for (label, p), n in errors.most_common():
+        print(f"  {label:>12} -> {p:<12} x{n}")
+
+    print(f"\n{'keywords':>9} {'legacy us':>10} {'classify us':>12} {'many us':>9}")
+    for extra in args.grow:
+        kws = grown(extra)
+        total = sum(len(v) for v in kws.values())
+        legacy = legacy_classifier(kws)
+        automaton = KeywordAutomaton(kws)
+
+        def single(m: str) -> int:
+            return automaton.scan(" ".join(m.lower().split()))
+
+        def batch(ms: list[str]) -> list[int]:
+            return automaton.scan_many("\x00".join(" ".join(m.lower().split()) for m in ms), "\x00")
+
+        t_legacy = per_message_us(legacy, messages, args.repeat)
+        t_single = per_message_us(single, messages, args.repeat)
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            batch(messages)
+        t_many = (time.perf_counter() - t0) / (args.repeat * len(messages)) * 1e6
+        print(f"{total:>9} {t_legacy:>10.2f} {t_single:>12.2f} {t_many:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response starts",
+    ["method", "route", "status"],
+)
+STAGE_SECONDS = Histogram(
+    "dealermate_stage_duration_seconds",
+    "Latency of one processing stage within a request",
+    ["stage", "tool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+# stages finished so far in the current request, for the Server-Timing header
+_timings: ContextVar[list[tuple[str, float]] | None] = ContextVar("timings", default=None)
+
+
+def observe(stage: str, seconds: float, tool: str = "") -> None:
+    STAGE_SECONDS.labels(stage, tool).observe(seconds)
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((f"{stage}.{tool}" if tool else stage, seconds))
+
+
+@contextmanager
+def timed(stage: str, tool: str = "") -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - t0, tool)
+
+
+def server_timing(timings: list[tuple[str, float]], total: float) -> str:
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class MetricsMiddleware:
+    """ASGI middleware: request histogram + ``Server-Timing`` header from the recorded stages.
+
+    Stages that finish after the response has started (streamed bodies, background
+    work) still land in the histograms, just not in the header.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+        timings: list[tuple[str, float]] = []
+        token = _timings.set(timings)
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                total = time.perf_counter() - t0
+                route = getattr(scope.get("route"), "path", "unmatched")
+                REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(total)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings, total).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
+
+
+def install(app: FastAPI) -> None:
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics() -> Response:
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,58 @@
+"""Copy the shared modules in services/common into every service that uses them.
+
+Each service image is built from its own directory (see docker-compose.yml), so shared
+code is vendored into the services rather than imported from here. This directory is the
+only place to edit it; the copies carry a header pointing back and are regenerated with:
+
+    python services/common/sync.py            # write the copies
+    python services/common/sync.py --check    # exit 1 if a copy has drifted
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+COMMON = Path(__file__).resolve().parent
+SERVICES = COMMON.parent
+
+# shared module -> vendored copies (relative to services/)
+TARGETS: dict[str, tuple[str, ...]] = {
+    "metrics.py": (
+        "api/app/core/metrics.py",
+        "mcp-orchestrator/app/metrics.py",
+        "mcp-inventory/app/metrics.py",
+        "mcp-history/app/metrics.py",
+        "mcp-pricing/app/metrics.py",
+    ),
+}
+
+HEADER = "# Vendored from services/common/{name}; edit it there and run services/common/sync.py.\n"
+
+
+def vendored(name: str) -> str:
+    return HEADER.format(name=name) + (COMMON / name).read_text(encoding="utf-8")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--check", action="store_true", help="only report copies that differ")
+    args = ap.parse_args()
+
+    stale = []
+    for name, targets in TARGETS.items():
+        expected = vendored(name)
+        for target in targets:
+            path = SERVICES / target
+            if path.exists() and path.read_text(encoding="utf-8") == expected:
+                continue
+            stale.append(target)
+            if not args.check:
+                path.write_text(expected, encoding="utf-8")
+    for target in stale:
+        print(f"{'stale' if args.check else 'updated'}: services/{target}")
+    return 1 if args.check and stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,47 +1,68 @@
 from fastapi import FastAPI
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.metrics import install as install_metrics
 
 app = FastAPI(title="MCP History", version="0.1.0")
+install_metrics(app)
 
 
 class PlateRequest(BaseModel):
     plate: str
 
 
+class PlatesRequest(BaseModel):
+    plates: list[str] = Field(..., min_length=1, max_length=50)
+
+
 @app.get("/health")
 def health():
     return {"ok": True}
 
 
-@app.post("/tools/get_vehicle_registry_summary")
-def get_vehicle_registry_summary(payload: PlateRequest):
+def _registry_summary(plate: str) -> dict:
     # demo output, replace with 원부/압류/저당 API
-    owner_changes = 2 if payload.plate.endswith("3456") else 1
+    owner_changes = 2 if plate.endswith("3456") else 1
     return {
-        "ok": True,
-        "data": {
-            "plate": payload.plate,
-            "owner_changes": owner_changes,
-            "lien": payload.plate.endswith("2222"),
-            "notes": "원부 요약(데모): 실서비스에서는 원천 원부 API에서 조회합니다.",
-        },
+        "plate": plate,
+        "owner_changes": owner_changes,
+        "lien": plate.endswith("2222"),
+        "notes": "원부 요약(데모): 실서비스에서는 원천 원부 API에서 조회합니다.",
     }
 
 
-@app.post("/tools/get_maintenance_history")
-def get_maintenance_history(payload: PlateRequest):
+def _maintenance_history(plate: str) -> dict:
     # demo output, replace with 정비이력 API
-    total = 7 if payload.plate.endswith("3456") else 3
+    total = 7 if plate.endswith("3456") else 3
     items = [
         {"date": "2025-08-12", "type": "엔진오일", "memo": "정기 교환"},
         {"date": "2025-03-21", "type": "브레이크", "memo": "패드 교체"},
     ]
     return {
-        "ok": True,
-        "data": {
-            "plate": payload.plate,
-            "total_records": total,
-            "recent": items,
-            "notes": "정비 이력 요약(데모)"
-        },
+        "plate": plate,
+        "total_records": total,
+        "recent": items,
+        "notes": "정비 이력 요약(데모)"
     }
+
+
+@app.post("/tools/get_vehicle_registry_summary")
+def get_vehicle_registry_summary(payload: PlateRequest):
+    return {"ok": True, "data": _registry_summary(payload.plate)}
+
+
+@app.post("/tools/get_maintenance_history")
+def get_maintenance_history(payload: PlateRequest):
+    return {"ok": True, "data": _maintenance_history(payload.plate)}
+
+
+# Batch variants: one upstream request per source for several plates (results keyed by plate).
+# The real 원부/정비 backends bill per request, so callers should prefer these for multi-car lookups.
+@app.post("/tools/get_vehicle_registry_summary_batch")
+def get_vehicle_registry_summary_batch(payload: PlatesRequest):
+    return {"ok": True, "data": {p: _registry_summary(p) for p in dict.fromkeys(payload.plates)}}
+
+
+@app.post("/tools/get_maintenance_history_batch")
+def get_maintenance_history_batch(payload: PlatesRequest):
+    return {"ok": True, "data": {p: _maintenance_history(p) for p in dict.fromkeys(payload.plates)}}
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+# Categorical columns are stored as int32 codes into a per-column vocabulary
+CATEGORICAL_COLUMNS = ("maker", "model", "fuel", "branch_id")
+NUMERIC_COLUMNS = ("year", "km", "price")
+# Secondary (equality) indexes: category code -> ascending row ids
+INDEXED_COLUMNS = ("branch_id",)
+
+
+class ColumnarListings:
+    """Columnar (NumPy) view of the listing store used for batched scoring.
+
+    Substring features on text columns (e.g. "model contains 쏘렌토") are evaluated once
+    per distinct value and broadcast to rows through the category codes, so a query costs
+    a handful of vectorized ops regardless of how many listings share a model.
+
+    Equality filters (``branch_id``, no-accident) are answered from posting lists built
+    once per load; range and exclusion masks then run over those candidates only.
+    """
+
+    def __init__(self, rows: Sequence[dict[str, Any]], version: int = 0) -> None:
+        self.version = version
+        self.size = len(rows)
+        self.vocab: dict[str, np.ndarray] = {}
+        self.codes: dict[str, np.ndarray] = {}
+        for col in CATEGORICAL_COLUMNS:
+            values = np.array([r.get(col) or "" for r in rows], dtype=object)
+            vocab, codes = np.unique(values, return_inverse=True) if self.size else (np.array([], dtype=object), np.array([], dtype=np.int64))
+            self.vocab[col] = vocab
+            self.codes[col] = codes.astype(np.int32)
+        self.numeric: dict[str, np.ndarray] = {
+            col: np.array([r.get(col) or 0 for r in rows], dtype=np.int64) for col in NUMERIC_COLUMNS
+        }
+        self.accident = np.array([bool(r.get("accident")) for r in rows], dtype=bool)
+        self._postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for col in INDEXED_COLUMNS:
+            # stable sort keeps row ids ascending (feed order) within each category
+            order = np.argsort(self.codes[col], kind="stable")
+            bounds = np.searchsorted(self.codes[col][order], np.arange(len(self.vocab[col]) + 1))
+            self._postings[col] = (order, bounds)
+        self._no_accident_ids = np.flatnonzero(~self.accident)
+        self._substring_cache: dict[tuple[str, tuple[str, ...]], np.ndarray] = {}
+
+    def code_of(self, col: str, value: str) -> int | None:
+        vocab = self.vocab[col]
+        i = int(np.searchsorted(vocab, value))
+        return i if i < len(vocab) and vocab[i] == value else None
+
+    def ids_with(self, col: str, value: str) -> np.ndarray:
+        """Row ids (ascending) whose ``col`` equals ``value``, from the secondary index."""
+        code = self.code_of(col, value)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        order, bounds = self._postings[col]
+        return order[bounds[code] : bounds[code + 1]]
+
+    def contains_any(self, col: str, needles: Sequence[str]) -> np.ndarray:
+        """Per-category bool table: value of ``col`` contains any of ``needles``."""
+        key = (col, tuple(needles))
+        table = self._substring_cache.get(key)
+        if table is None:
+            table = np.array([any(n in v for n in needles) for v in self.vocab[col]], dtype=bool)
+            self._substring_cache[key] = table
+        return table
+
+    def filter_ids(
+        self,
+        branch_id: str | None = None,
+        exclude_accident: bool = False,
+        ranges: dict[str, tuple[int | None, int | None]] | None = None,
+        exclude: dict[str, Sequence[str]] | None = None,
+    ) -> np.ndarray:
+        """Row ids passing the hard filters (applied before scoring).
+
+        ``ranges`` maps a numeric column to inclusive ``(min, max)`` bounds (``None`` = open);
+        ``exclude`` maps a categorical column to substrings whose rows are dropped.
+        """
+        # intersect the indexed candidate sets first (smallest drives the rest)
+        if branch_id:
+            ids = self.ids_with("branch_id", branch_id)
+            if exclude_accident:
+                ids = ids[~self.accident[ids]]
+        elif exclude_accident:
+            ids = self._no_accident_ids
+        else:
+            ids = np.arange(self.size, dtype=np.int64)
+        for col, (lo, hi) in (ranges or {}).items():
+            if lo is not None:
+                ids = ids[self.numeric[col][ids] >= lo]
+            if hi is not None:
+                ids = ids[self.numeric[col][ids] <= hi]
+        for col, needles in (exclude or {}).items():
+            if needles and ids.size:
+                ids = ids[~self.contains_any(col, needles)[self.codes[col][ids]]]
+        return ids
+
+    def top_k(self, ids: np.ndarray, scores: np.ndarray, k: int) -> list[int]:
+        """Top-k row ids by (score desc, price asc, feed order) via partial selection."""
+        if ids.size == 0:
+            return []
+        price = self.numeric["price"][ids]
+        # single int64 sort key reproducing the stable (-score, price) ordering
+        price_span = int(price.max() - price.min()) + 1
+        key = ((scores.max() - scores).astype(np.int64) * price_span + (price - price.min())) * self.size + ids
+        if k < ids.size:
+            part = np.argpartition(key, k - 1)[:k]
+        else:
+            part = np.arange(ids.size)
+        return ids[part[np.argsort(key[part])]].tolist()
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import os
 from datetime import date
+from functools import lru_cache
 from typing import Any
 
+import numpy as np
 from fastapi import FastAPI
 from pydantic import BaseModel, Field
 
+from app.engine import ColumnarListings
+from app.metrics import install as install_metrics
+from app.query import SUV_MODELS, QueryCondition, parse_query
+from app.store import ListingStore
+
 app = FastAPI(title="MCP Inventory", version="0.1.0")
+install_metrics(app)
 
 
 # Demo dataset (replace with legacy API calls)
@@ -74,6 +83,14 @@ LISTINGS = [
 ]
 
 
+# Indexed listing store; INVENTORY_DATA_FILE (JSON / JSON-lines) overrides the demo feed
+store = ListingStore()
+if os.getenv("INVENTORY_DATA_FILE"):
+    store.load_file(os.environ["INVENTORY_DATA_FILE"])
+else:
+    store.load(LISTINGS)
+
+
 class GetCarByPlateRequest(BaseModel):
     plate: str
     branch_id: str | None = None
@@ -90,6 +107,7 @@ class SearchListingsRequest(BaseModel):
 class CompareListingsRequest(BaseModel):
     query: str
     top_k: int = Field(default=3, ge=1, le=5)
+    branch_id: str | None = None
 
 
 class MonthlySalesStatsRequest(BaseModel):
@@ -104,56 +122,70 @@ def health():
 
 @app.post("/tools/get_car_by_plate")
 def get_car_by_plate(payload: GetCarByPlateRequest):
-    for l in LISTINGS:
-        if l["plate"] == payload.plate and (payload.branch_id is None or l["branch_id"] == payload.branch_id):
-            return {"ok": True, "data": l}
+    l = store.get_by_plate(payload.plate)
+    if l is not None and (payload.branch_id is None or l["branch_id"] == payload.branch_id):
+        return {"ok": True, "data": l}
     return {"ok": True, "data": {"plate": payload.plate, "model": None, "year": None, "km": None}}
 
 
-@app.post("/tools/search_listings")
-def search_listings(payload: SearchListingsRequest):
-    q = payload.query
-    # demo heuristic: if contains '무사고' filter out accident True; if 'suv' prefer sorento/tucson
-    must_no_acc = ("무사고" in q) or ("사고없" in q)
-    prefer_suv = ("suv" in q.lower()) or ("suv" in q.upper()) or ("suv" in q) or ("쏘렌토" in q) or ("투싼" in q) or ("suv" in q.lower())
-
-    cand = []
-    for l in LISTINGS:
-        if payload.branch_id and l["branch_id"] != payload.branch_id:
-            continue
-        if must_no_acc and l["accident"]:
-            continue
-        score = 0
-        if prefer_suv and any(k in l["model"] for k in ["쏘렌토", "투싼", "싼타페", "스포티지"]):
-            score += 2
-        if "제네시스" in q and "제네시스" in l["model"]:
-            score += 2
-        if "디젤" in q and l["fuel"] == "디젤":
-            score += 1
-        if "가솔린" in q and l["fuel"] == "가솔린":
-            score += 1
-        cand.append((score, l))
-
-    cand.sort(key=lambda x: (-x[0], x[1]["price"]))
-    top = [x[1] for x in cand[: payload.top_k]]
+# Ranked ids are cached this deep so search (top_k<=10) and compare (top_k<=5) share entries
+RANK_CACHE_DEPTH = 10
+COMPARE_COLUMNS = ("year", "km", "price")
 
-    # "정제 3개" 컨셉
-    return {
-        "ok": True,
-        "data": {
-            "items": top,
-            "explain": "검색 결과를 조건/선호에 맞춰 3개로 정제했습니다.",
-            "filters": {"no_accident": must_no_acc, "prefer_suv": prefer_suv},
-        },
-    }
 
+def rank_listings(cols: ColumnarListings, q: str, branch_id: str | None, top_k: int) -> tuple[list[int], QueryCondition]:
+    """Rank listings for a free-text query; returns top row ids and the parsed condition.
 
-@app.post("/tools/compare_listings")
-def compare_listings(payload: CompareListingsRequest):
-    # naive: reuse search and build a compare sheet
-    items = LISTINGS[: payload.top_k]
+    The parsed (cached) condition drives both the hard filters and the scoring terms.
+    """
+    cond = parse_query(q)
+    return rank_condition(cols, cond, branch_id, top_k), cond
+
+
+def rank_condition(cols: ColumnarListings, cond: QueryCondition, branch_id: str | None, top_k: int) -> list[int]:
+    # hard filters first, then one vectorized scoring pass over the surviving rows
+    ids = cols.filter_ids(
+        branch_id=branch_id,
+        exclude_accident=cond.no_accident,
+        ranges={"price": (cond.price_min, cond.price_max), "year": (cond.year_min, cond.year_max), "km": (None, cond.km_max)},
+        exclude={"maker": cond.exclude_makers, "model": cond.exclude_models, "fuel": cond.exclude_fuels},
+    )
+    scores = np.zeros(ids.size, dtype=np.int64)
+    model_codes = cols.codes["model"][ids]
+    if cond.prefer_suv:
+        scores += 2 * cols.contains_any("model", SUV_MODELS)[model_codes]
+    elif "sedan" in cond.body:
+        scores += 2 * ~cols.contains_any("model", SUV_MODELS)[model_codes]
+    if cond.models:
+        scores += 2 * cols.contains_any("model", cond.models)[model_codes]
+    if cond.makers:
+        scores += cols.contains_any("maker", cond.makers)[cols.codes["maker"][ids]]
+    if cond.fuels:
+        scores += cols.contains_any("fuel", cond.fuels)[cols.codes["fuel"][ids]]
+
+    return cols.top_k(ids, scores, top_k)
+
+
+@lru_cache(maxsize=2048)
+def _ranked_ids(cond: QueryCondition, branch_id: str | None, version: int) -> tuple[int, ...]:
+    # keyed by the parsed condition, so differently worded messages with the same
+    # conditions (e.g. recommend -> compare on one customer) reuse one ranking
+    return tuple(rank_condition(store.columns(), cond, branch_id, RANK_CACHE_DEPTH))
+
+
+def ranked_listings(q: str, branch_id: str | None, top_k: int) -> tuple[list[dict[str, Any]], QueryCondition]:
+    cond = parse_query(q)
+    ids = _ranked_ids(cond, branch_id or None, store.version)[:top_k]
+    return [store.rows[i] for i in ids], cond
+
+
+@lru_cache(maxsize=1024)
+def _compare_sheet(listing_ids: tuple[str, ...], best_id: str, version: int) -> dict[str, Any]:
+    """Compare sheet for a set of listings, keyed by sorted ids + inventory version."""
+    best = store.get_by_listing_id(best_id)
     rows = []
-    for l in items:
+    for lid in listing_ids:
+        l = store.get_by_listing_id(lid)
         rows.append(
             {
                 "listing_id": l["listing_id"],
@@ -163,9 +195,49 @@ def compare_listings(payload: CompareListingsRequest):
                 "accident": l["accident"],
                 "price": l["price"],
                 "highlight": "무사고" if not l["accident"] else "사고이력",
+                "is_best": lid == best_id,
+                "delta": {c: l[c] - best[c] for c in COMPARE_COLUMNS},
             }
         )
-    return {"ok": True, "data": {"rows": rows, "notes": "핵심 항목 기준 비교표입니다."}}
+    return {"rows": rows, "best_listing_id": best_id}
+
+
+@app.post("/tools/search_listings")
+def search_listings(payload: SearchListingsRequest):
+    top, cond = ranked_listings(payload.query, payload.branch_id, payload.top_k)
+
+    # "정제 3개" 컨셉
+    return {
+        "ok": True,
+        "data": {
+            "items": top,
+            "explain": "검색 결과를 조건/선호에 맞춰 3개로 정제했습니다.",
+            "filters": {"no_accident": cond.no_accident, "prefer_suv": cond.prefer_suv},
+            "condition": cond.as_dict(),
+        },
+    }
+
+
+@app.post("/tools/compare_listings")
+def compare_listings(payload: CompareListingsRequest):
+    # same ranked retrieval as search_listings; deltas are against the top-ranked (best) candidate
+    items, cond = ranked_listings(payload.query, payload.branch_id, payload.top_k)
+    if not items:
+        return {"ok": True, "data": {"rows": [], "best_listing_id": None, "condition": cond.as_dict(), "notes": "조건에 맞는 비교 대상 매물이 없습니다."}}
+
+    sheet = _compare_sheet(tuple(sorted(l["listing_id"] for l in items)), items[0]["listing_id"], store.version)
+    by_id = {r["listing_id"]: r for r in sheet["rows"]}
+    rows = [by_id[l["listing_id"]] for l in items]
+    return {
+        "ok": True,
+        "data": {
+            "rows": rows,
+            "best_listing_id": sheet["best_listing_id"],
+            "delta_columns": list(COMPARE_COLUMNS),
+            "condition": cond.as_dict(),
+            "notes": "핵심 항목 기준 비교표입니다. delta는 최상위 추천 매물 대비 차이입니다.",
+        },
+    }
 
 
 @app.post("/tools/get_monthly_sales_stats")
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Any
+
+# canonical value -> aliases (matched on the lower-cased query)
+MAKER_ALIASES: dict[str, tuple[str, ...]] = {
+    "현대": ("현대", "hyundai"),
+    "기아": ("기아", "kia"),
+    "BMW": ("bmw", "비엠"),
+    "벤츠": ("벤츠", "benz", "mercedes"),
+    "아우디": ("아우디", "audi"),
+}
+MODEL_ALIASES: dict[str, tuple[str, ...]] = {
+    "제네시스": ("제네시스", "genesis"),
+    "쏘렌토": ("쏘렌토", "sorento"),
+    "투싼": ("투싼", "tucson"),
+    "싼타페": ("싼타페", "santafe"),
+    "스포티지": ("스포티지", "sportage"),
+    "그랜저": ("그랜저", "grandeur"),
+    "쏘나타": ("쏘나타", "소나타", "sonata"),
+    "아반떼": ("아반떼", "avante"),
+    "K5": ("k5",),
+    "320d": ("320d",),
+}
+FUEL_ALIASES: dict[str, tuple[str, ...]] = {
+    "디젤": ("디젤", "경유", "diesel"),
+    "가솔린": ("가솔린", "휘발유", "gasoline"),
+    "하이브리드": ("하이브리드", "hybrid"),
+    "전기": ("전기차", "ev"),
+    "LPG": ("lpg", "엘피지"),
+}
+BODY_ALIASES: dict[str, tuple[str, ...]] = {
+    "suv": ("suv",),
+    "sedan": ("sedan", "세단"),
+}
+SUV_MODELS = ("쏘렌토", "투싼", "싼타페", "스포티지")
+
+# amount units in 만원; "천"/"백" inside an amount are thousands/hundreds of 만 ("2천5백만" = 2500)
+_UNIT = {"억": 10000, "천만": 1000, "천": 1000, "백만": 100, "백": 100, "만": 1}
+# adjacent amount parts form one amount ("1억5천만", "2천5백만", "1억 2000만")
+_AMOUNT = r"\d+(?:\.\d+)?\s*(?:억|천만|백만|천|백|만)(?:\s*\d+(?:\.\d+)?\s*(?:천만|백만|천|백|만))*"
+_AMOUNT_PART = re.compile(r"(\d+(?:\.\d+)?)\s*(억|천만|백만|천|백|만)")
+_NEGATION = r"(?:\s*(?P<neg>제외|빼고|말고|싫어|은\s*싫|는\s*싫|안\s*됨))?"
+
+
+def _alt(aliases: dict[str, tuple[str, ...]]) -> str:
+    words = sorted((a for names in aliases.values() for a in names), key=len, reverse=True)
+    return "|".join(re.escape(w) for w in words)
+
+
+def _lookup(aliases: dict[str, tuple[str, ...]]) -> dict[str, str]:
+    return {a: canon for canon, names in aliases.items() for a in names}
+
+
+_TERM_KIND = {
+    **{a: ("maker", c) for a, c in _lookup(MAKER_ALIASES).items()},
+    **{a: ("model", c) for a, c in _lookup(MODEL_ALIASES).items()},
+    **{a: ("fuel", c) for a, c in _lookup(FUEL_ALIASES).items()},
+    **{a: ("body", c) for a, c in _lookup(BODY_ALIASES).items()},
+}
+
+# One precompiled pattern; a single finditer pass extracts every condition.
+_QUERY_PAT = re.compile(
+    r"(?P<noacc>무사고|사고\s*없)"
+    r"|(?P<km>\d+(?:\.\d+)?)\s*(?P<km_unit>만)?\s*(?:km|키로|킬로)\s*(?P<km_op>이하|이내|미만|아래|이상)?"
+    rf"|(?P<price>{_AMOUNT})\s*원?\s*(?P<price_op>이하|이내|까지|미만|아래|이상|넘는|부터)?"
+    r"|(?P<year>(?:19|20)\d{2}\s*년\s*식?|\d{2}\s*년식)\s*(?P<year_op>이상|이후|부터|이하|이전|까지)?"
+    r"|(?P<age>\d{1,2})\s*년\s*(?P<age_op>이하|이내|미만|안\s*된|이상|넘은|넘는|초과|지난)"
+    rf"|(?P<term>{'|'.join(_alt(a) for a in (MAKER_ALIASES, MODEL_ALIASES, FUEL_ALIASES, BODY_ALIASES))}){_NEGATION}"
+)
+_SPACES = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class QueryCondition:
+    """Structured search condition parsed from a free-text dealer query (prices in 만원)."""
+
+    no_accident: bool = False
+    price_min: int | None = None
+    price_max: int | None = None
+    year_min: int | None = None
+    year_max: int | None = None
+    km_max: int | None = None
+    makers: tuple[str, ...] = ()
+    models: tuple[str, ...] = ()
+    fuels: tuple[str, ...] = ()
+    body: tuple[str, ...] = ()
+    exclude_makers: tuple[str, ...] = ()
+    exclude_models: tuple[str, ...] = ()
+    exclude_fuels: tuple[str, ...] = ()
+
+    @property
+    def prefer_suv(self) -> bool:
+        return "suv" in self.body or any(m in SUV_MODELS for m in self.models)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {k: list(v) if isinstance(v, tuple) else v for k, v in asdict(self).items()}
+
+
+def normalize_query(q: str) -> str:
+    return _SPACES.sub(" ", q.strip().lower())
+
+
+def parse_query(q: str) -> QueryCondition:
+    return _parse_normalized(normalize_query(q), date.today().year)
+
+
+def _amount(text: str) -> int:
+    return int(sum(float(n) * _UNIT[unit] for n, unit in _AMOUNT_PART.findall(text)))
+
+
+@lru_cache(maxsize=4096)
+def _parse_normalized(q: str, this_year: int) -> QueryCondition:
+    # this_year resolves ages ("10년 이하") and is part of the cache key
+    out: dict[str, Any] = {}
+    picked: dict[str, list[str]] = {k: [] for k in ("makers", "models", "fuels", "body", "exclude_makers", "exclude_models", "exclude_fuels")}
+
+    for m in _QUERY_PAT.finditer(q):
+        if m.group("noacc"):
+            out["no_accident"] = True
+        elif m.group("price"):
+            value = _amount(m.group("price"))
+            key = "price_min" if m.group("price_op") in ("이상", "넘는", "부터") else "price_max"
+            out[key] = value
+        elif m.group("km"):
+            value = int(float(m.group("km")) * (10000 if m.group("km_unit") else 1))
+            if m.group("km_op") != "이상":
+                out["km_max"] = value
+        elif m.group("age"):
+            # vehicle age: "10년 이하" = model year this_year - 10 or newer
+            age = int(m.group("age"))
+            if m.group("age_op") in ("이상", "넘은", "넘는", "초과", "지난"):
+                out["year_max"] = this_year - age
+            else:
+                out["year_min"] = this_year - age + (1 if m.group("age_op") == "미만" else 0)
+        elif m.group("year"):
+            year = int(re.match(r"\d+", m.group("year")).group())
+            if year < 100:
+                year += 2000 if year <= 50 else 1900
+            key = "year_max" if m.group("year_op") in ("이하", "이전", "까지") else "year_min"
+            out[key] = year
+        else:
+            kind, canon = _TERM_KIND[m.group("term")]
+            if m.group("neg") and kind != "body":
+                picked[f"exclude_{kind}s"].append(canon)
+            elif not m.group("neg"):
+                picked["body" if kind == "body" else f"{kind}s"].append(canon)
+
+    for k, values in picked.items():
+        out[k] = tuple(dict.fromkeys(values))
+    return QueryCondition(**out)
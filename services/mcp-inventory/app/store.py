@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from app.engine import ColumnarListings
+
+
+class ListingStore:
+    """In-memory listing store with hash indexes on ``plate`` and ``listing_id`` (O(1) lookups).
+
+    Filtering runs on the columnar view: ``branch_id`` and accident-free candidates come
+    from its secondary indexes, and range / exclusion masks only touch those rows. Row ids
+    are insertion positions, so filtered candidates keep feed order (search ranking relies
+    on a stable order for ties).
+    """
+
+    def __init__(self) -> None:
+        self.rows: list[dict[str, Any]] = []
+        self.by_plate: dict[str, int] = {}
+        self.by_listing_id: dict[str, int] = {}
+        # bumped on every (re)load so derived caches can be invalidated
+        self.version = 0
+        self._columns: ColumnarListings | None = None
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def load(self, listings: Iterable[dict[str, Any]]) -> None:
+        """Replace the store contents (e.g. from the legacy 상사시스템 feed)."""
+        self.rows = []
+        self.by_plate = {}
+        self.by_listing_id = {}
+        for listing in listings:
+            self._add(listing)
+        self.version += 1
+
+    def load_file(self, path: str | Path) -> None:
+        """Load listings from a JSON array or a JSON-lines file."""
+        text = Path(path).read_text(encoding="utf-8")
+        if text.lstrip().startswith("["):
+            self.load(json.loads(text))
+        else:
+            self.load(json.loads(line) for line in text.splitlines() if line.strip())
+
+    def _add(self, listing: dict[str, Any]) -> None:
+        rid = len(self.rows)
+        self.rows.append(listing)
+        self.by_plate[listing["plate"]] = rid
+        self.by_listing_id[listing["listing_id"]] = rid
+
+    def columns(self) -> ColumnarListings:
+        """Columnar view for vectorized scoring, rebuilt lazily after a reload."""
+        if self._columns is None or self._columns.version != self.version:
+            self._columns = ColumnarListings(self.rows, version=self.version)
+        return self._columns
+
+    def get_by_plate(self, plate: str) -> dict[str, Any] | None:
+        rid = self.by_plate.get(plate)
+        return self.rows[rid] if rid is not None else None
+
+    def get_by_listing_id(self, listing_id: str) -> dict[str, Any] | None:
+        rid = self.by_listing_id.get(listing_id)
+        return self.rows[rid] if rid is not None else None
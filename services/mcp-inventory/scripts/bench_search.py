@@ -0,0 +1,102 @@
+"""Per-query cost of search_listings scoring at several inventory sizes.
+
+Compares the legacy per-listing Python loop with the columnar NumPy engine and checks
+that both return the same ranking. Run from services/mcp-inventory:
+
+    python -m scripts.bench_search [--sizes 10000 100000 1000000] [--queries 20]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.engine import ColumnarListings
+from app.main import SUV_MODELS, rank_listings
+
+MODELS = [
+    ("현대", "제네시스 G330"), ("현대", "투싼"), ("현대", "싼타페"), ("현대", "아반떼"), ("현대", "그랜저"),
+    ("기아", "쏘렌토"), ("기아", "스포티지"), ("기아", "K5"), ("BMW", "320d"), ("BMW", "520d"),
+]
+# queries the legacy keyword loop understands (the query parser adds budget/year/km/alias filters on top)
+QUERIES = ["무사고 suv 디젤", "제네시스 가솔린", "무사고 suv", "가솔린", "suv"]
+
+
+def synth(n: int, seed: int = 7) -> list[dict]:
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        maker, model = rnd.choice(MODELS)
+        rows.append(
+            {
+                "listing_id": f"L{i:07d}",
+                "plate": f"{i % 100:02d}가{i:07d}",
+                "maker": maker,
+                "model": model,
+                "year": rnd.randint(2012, 2024),
+                "km": rnd.randint(5, 250) * 1000,
+                "fuel": rnd.choice(["가솔린", "디젤", "하이브리드"]),
+                "price": rnd.randint(600, 6000),
+                "branch_id": f"BR{rnd.randint(1, 20):02d}",
+                "accident": rnd.random() < 0.2,
+            }
+        )
+    return rows
+
+
+def legacy(rows: list[dict], q: str, branch_id: str, top_k: int) -> list[str]:
+    must_no_acc = ("무사고" in q) or ("사고없" in q)
+    prefer_suv = ("suv" in q.lower()) or ("쏘렌토" in q) or ("투싼" in q)
+    cand = []
+    for l in rows:
+        if branch_id and l["branch_id"] != branch_id:
+            continue
+        if must_no_acc and l["accident"]:
+            continue
+        score = 0
+        if prefer_suv and any(k in l["model"] for k in SUV_MODELS):
+            score += 2
+        if "제네시스" in q and "제네시스" in l["model"]:
+            score += 2
+        if "디젤" in q and l["fuel"] == "디젤":
+            score += 1
+        if "가솔린" in q and l["fuel"] == "가솔린":
+            score += 1
+        cand.append((score, l))
+    cand.sort(key=lambda x: (-x[0], x[1]["price"]))
+    return [x[1]["listing_id"] for x in cand[:top_k]]
+
+
+def columnar(cols: ColumnarListings, rows: list[dict], q: str, branch_id: str, top_k: int) -> list[str]:
+    top_ids, _ = rank_listings(cols, q, branch_id, top_k)
+    return [rows[i]["listing_id"] for i in top_ids]
+
+
+def bench(fn, queries: list[tuple[str, str]]) -> tuple[float, list]:
+    out = []
+    t0 = time.perf_counter()
+    for q, br in queries:
+        out.append(fn(q, br))
+    return (time.perf_counter() - t0) / len(queries) * 1000, out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    ap.add_argument("--queries", type=int, default=20)
+    ap.add_argument("--top-k", type=int, default=3)
+    args = ap.parse_args()
+
+    rnd = random.Random(1)
+    print(f"{'listings':>10} {'legacy ms/q':>12} {'numpy ms/q':>11} {'speedup':>8}  same ranking")
+    for n in args.sizes:
+        rows = synth(n)
+        cols = ColumnarListings(rows)
+        queries = [(rnd.choice(QUERIES), rnd.choice(["", "BR03", "BR11"])) for _ in range(args.queries)]
+        legacy_ms, a = bench(lambda q, br: legacy(rows, q, br, args.top_k), queries)
+        numpy_ms, b = bench(lambda q, br: columnar(cols, rows, q, br, args.top_k), queries)
+        print(f"{n:>10} {legacy_ms:>12.2f} {numpy_ms:>11.2f} {legacy_ms / numpy_ms:>7.1f}x  {a == b}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import numpy as np
+
+from app.engine import ColumnarListings
+
+
+ROWS = [
+    {"maker": "기아", "model": "쏘렌토", "fuel": "디젤", "branch_id": b, "year": 2016 + i % 8, "km": 10000 * i, "price": 1500 + 100 * i, "accident": i % 3 == 0}
+    for i, b in enumerate(["B1", "B2", "B1", "B3", "B1", "B2", "B1", "B1", "B3", "B2"] * 3)
+]
+
+
+def brute(branch_id, exclude_accident, lo, hi):
+    return [
+        i
+        for i, r in enumerate(ROWS)
+        if (not branch_id or r["branch_id"] == branch_id)
+        and not (exclude_accident and r["accident"])
+        and (lo is None or r["price"] >= lo)
+        and (hi is None or r["price"] <= hi)
+    ]
+
+
+def test_filter_ids_matches_a_full_scan():
+    cols = ColumnarListings(ROWS)
+    for branch_id in (None, "B1", "B3", "B9"):
+        for exclude_accident in (False, True):
+            for lo, hi in ((None, None), (2000, None), (None, 3500), (2000, 3500)):
+                ids = cols.filter_ids(branch_id=branch_id, exclude_accident=exclude_accident, ranges={"price": (lo, hi)})
+                assert ids.tolist() == brute(branch_id, exclude_accident, lo, hi)
+
+
+def test_branch_postings_keep_feed_order():
+    ids = ColumnarListings(ROWS).ids_with("branch_id", "B2")
+    assert ids.tolist() == [i for i, r in enumerate(ROWS) if r["branch_id"] == "B2"]
+    assert np.all(np.diff(ids) > 0)
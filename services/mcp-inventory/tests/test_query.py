@@ -0,0 +1,51 @@
+import pytest
+
+from app.query import _parse_normalized, normalize_query, parse_query
+
+
+def parse(q: str, this_year: int = 2026):
+    return _parse_normalized(normalize_query(q), this_year)
+
+
+@pytest.mark.parametrize(
+    ("query", "price_min", "price_max"),
+    [
+        ("1억5천만원 이하", None, 15000),
+        ("2천5백만원 이하", None, 2500),
+        ("1억 2000만원까지", None, 12000),
+        ("1.5억 이하", None, 15000),
+        ("3천만원 이하 쏘렌토", None, 3000),
+        ("2500만원 이상", 2500, None),
+    ],
+)
+def test_compound_price_amounts(query, price_min, price_max):
+    cond = parse(query)
+    assert (cond.price_min, cond.price_max) == (price_min, price_max)
+
+
+@pytest.mark.parametrize(
+    ("query", "year_min", "year_max"),
+    [
+        ("10년 이하", 2016, None),
+        ("3년 미만", 2024, None),
+        ("5년 이상 된 차", None, 2021),
+        ("2018년식 이상", 2018, None),
+        ("18년식", 2018, None),
+        ("2019년 이전", None, 2019),
+    ],
+)
+def test_model_year_and_age(query, year_min, year_max):
+    cond = parse(query)
+    assert (cond.year_min, cond.year_max) == (year_min, year_max)
+
+
+def test_km_is_not_a_price():
+    cond = parse("10만km 이하 2천만원")
+    assert cond.km_max == 100000
+    assert cond.price_max == 2000
+
+
+def test_exclusions_next_to_amounts():
+    cond = parse_query("1억5천만 이하 디젤 말고")
+    assert cond.price_max == 15000
+    assert cond.exclude_fuels == ("디젤",)
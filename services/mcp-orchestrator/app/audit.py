@@ -0,0 +1,196 @@
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import Any
+
+import redis.asyncio as aioredis
+import structlog
+
+log = structlog.get_logger("mcp-orchestrator")
+
+RESULT_PREVIEW_CHARS = 2000
+
+
+class AuditPipeline:
+    """Non-blocking writer for the ``mcp:audit`` Redis stream.
+
+    Request handlers only ``enqueue()`` raw events (no serialization, no I/O). A background
+    task drains the bounded queue and sends pipelined XADD batches through an asyncio Redis
+    client. When the queue is full (or Redis is unavailable) events are dropped or, with
+    ``overflow="spill"``, appended to a JSON-lines file that is replayed once Redis is back.
+    Remaining events are flushed on shutdown.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        stream: str = "mcp:audit",
+        maxlen: int = 5000,
+        queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.2,
+        overflow: str = "drop",
+        spill_path: str = "/tmp/mcp-audit-spill.jsonl",
+    ) -> None:
+        self.redis_url = redis_url
+        self.stream = stream
+        self.maxlen = maxlen
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=queue_size)
+        self._client: aioredis.Redis | None = None
+        self._task: asyncio.Task | None = None
+        self._inflight: list[dict[str, Any]] = []
+        self._stats = {"enqueued": 0, "flushed": 0, "batches": 0, "dropped": 0, "spilled": 0, "replayed": 0, "errors": 0}
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._client = aioredis.from_url(self.redis_url, decode_responses=True)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write out everything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # the batch the flusher was holding when cancelled comes first
+        batch, self._inflight = self._inflight, []
+        while batch or not self.queue.empty():
+            await self._flush(batch or self._drain(self.batch_size))
+            batch = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def enqueue(self, tool: str, args: Any, result: Any, started: datetime, finished: datetime, cache_status: str = "") -> None:
+        event = {
+            "tool": tool,
+            "args": args,
+            "result": result,
+            "started_at": started,
+            "finished_at": finished,
+            "cache": cache_status,
+        }
+        try:
+            self.queue.put_nowait(event)
+            self._stats["enqueued"] += 1
+        except asyncio.QueueFull:
+            self._overflow([event])
+
+    def _drain(self, limit: int) -> list[dict[str, Any]]:
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            self._inflight = [await self.queue.get()]
+            # give the batch a moment to fill up before one pipelined round-trip
+            if self.queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.flush_interval)
+            self._inflight += self._drain(self.batch_size - 1)
+            await self._flush(self._inflight)
+            self._inflight = []
+            if self.queue.empty() and self.overflow == "spill":
+                await self._replay_spill()
+
+    @staticmethod
+    def _serialize(event: dict[str, Any]) -> dict[str, str]:
+        result = event["result"]
+        if isinstance(result, (bytes, bytearray)):
+            # streamed responses are audited by their (already masked) leading bytes
+            result_text = bytes(result).decode("utf-8", errors="ignore")
+        else:
+            result_text = json.dumps(result, ensure_ascii=False)
+        return {
+            "tool": event["tool"],
+            "args": json.dumps(event["args"], ensure_ascii=False),
+            "result": result_text[:RESULT_PREVIEW_CHARS],
+            "started_at": event["started_at"].isoformat(),
+            "finished_at": event["finished_at"].isoformat(),
+            "cache": event["cache"],
+        }
+
+    async def _xadd(self, fields: list[dict[str, str]]) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            for f in fields:
+                pipe.xadd(self.stream, f, maxlen=self.maxlen, approximate=True)
+            await pipe.execute()
+
+    async def _flush(self, batch: list[dict[str, Any]]) -> None:
+        if not batch:
+            return
+        fields = [self._serialize(e) for e in batch]
+        try:
+            await self._xadd(fields)
+        except Exception as e:
+            self._stats["errors"] += 1
+            log.warning("audit_flush_failed", error=type(e).__name__, events=len(fields))
+            self._overflow(fields, serialized=True)
+            return
+        self._stats["flushed"] += len(fields)
+        self._stats["batches"] += 1
+
+    def _overflow(self, events: list[dict[str, Any]], serialized: bool = False) -> None:
+        if self.overflow != "spill":
+            self._stats["dropped"] += len(events)
+            return
+        fields = events if serialized else [self._serialize(e) for e in events]
+        self._stats["spilled" if self._append_spill(fields) else "dropped"] += len(events)
+
+    def _append_spill(self, fields: list[dict[str, str]]) -> bool:
+        try:
+            with open(self.spill_path, "a", encoding="utf-8") as fp:
+                for f in fields:
+                    fp.write(json.dumps(f, ensure_ascii=False) + "\n")
+        except OSError:
+            return False
+        return True
+
+    async def _replay_spill(self) -> None:
+        replay_path = f"{self.spill_path}.replay"
+        try:
+            # a replay interrupted by a crash is resumed before newer spills are taken
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spill_path):
+                    return
+                os.replace(self.spill_path, replay_path)
+            with open(replay_path, encoding="utf-8") as fp:
+                fields = [json.loads(line) for line in fp if line.strip()]
+        except (OSError, ValueError) as e:
+            log.warning("audit_replay_failed", error=type(e).__name__)
+            return
+        sent = 0
+        try:
+            for i in range(0, len(fields), self.batch_size):
+                chunk = fields[i : i + self.batch_size]
+                await self._xadd(chunk)
+                sent += len(chunk)
+        except BaseException as e:
+            # keep only the batches not sent yet for the next attempt (also when cancelled)
+            self._stats["replayed"] += sent
+            tmp_path = f"{replay_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fp:
+                for f in fields[sent:]:
+                    fp.write(json.dumps(f, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, replay_path)
+            if not isinstance(e, Exception):
+                raise
+            log.warning("audit_replay_failed", error=type(e).__name__, sent=sent, remaining=len(fields) - sent)
+            return
+        os.remove(replay_path)
+        self._stats["replayed"] += len(fields)
+
+    def stats(self) -> dict[str, Any]:
+        return {**self._stats, "queued": self.queue.qsize(), "overflow": self.overflow}
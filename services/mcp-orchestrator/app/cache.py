@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any
+
+import structlog
+
+log = structlog.get_logger("mcp-orchestrator")
+
+
+def canonical_args(args: dict[str, Any]) -> str:
+    return json.dumps(args, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+class ToolCache:
+    """Two-tier result cache for idempotent tools.
+
+    - L1: in-process LRU (per worker), entries expire after the tool's TTL
+    - L2: Redis (shared across workers) via SETEX on the existing client
+
+    Only tools with a TTL in ``policies`` are cached. Redis calls run in a worker
+    thread because the shared client is synchronous.
+    """
+
+    def __init__(self, rds: Any, policies: dict[str, float], max_entries: int = 2048, prefix: str = "mcp:cache:") -> None:
+        self.rds = rds
+        self.policies = policies
+        self.max_entries = max_entries
+        self.prefix = prefix
+        self._lru: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def cacheable(self, tool: str) -> bool:
+        return self.policies.get(tool, 0) > 0
+
+    def key(self, tool: str, args: dict[str, Any]) -> str:
+        digest = hashlib.sha1(canonical_args(args).encode("utf-8")).hexdigest()
+        return f"{self.prefix}{tool}:{digest}"
+
+    def _count(self, tool: str, field: str) -> None:
+        st = self._stats.setdefault(tool, {"hits": 0, "misses": 0, "l1_hits": 0, "l2_hits": 0, "invalidations": 0})
+        st[field] += 1
+
+    async def get(self, tool: str, args: dict[str, Any]) -> tuple[bool, Any]:
+        if not self.cacheable(tool):
+            return False, None
+        key = self.key(tool, args)
+        now = time.monotonic()
+
+        entry = self._lru.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._lru.move_to_end(key)
+                self._count(tool, "hits")
+                self._count(tool, "l1_hits")
+                return True, entry[1]
+            del self._lru[key]
+
+        try:
+            raw = await asyncio.to_thread(self.rds.get, key)
+        except Exception:
+            raw = None
+        if raw is not None:
+            value = json.loads(raw)
+            self._remember(key, tool, value)
+            self._count(tool, "hits")
+            self._count(tool, "l2_hits")
+            return True, value
+
+        self._count(tool, "misses")
+        return False, None
+
+    async def set(self, tool: str, args: dict[str, Any], value: Any) -> None:
+        if not self.cacheable(tool) or (isinstance(value, dict) and value.get("ok") is False):
+            return
+        key = self.key(tool, args)
+        self._remember(key, tool, value)
+        try:
+            await asyncio.to_thread(self.rds.setex, key, max(1, int(self.policies[tool])), json.dumps(value, ensure_ascii=False))
+        except Exception:
+            log.warning("cache_store_failed", tool=tool)
+
+    def _remember(self, key: str, tool: str, value: Any) -> None:
+        self._lru[key] = (time.monotonic() + self.policies[tool], value)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    async def invalidate(self, tool: str | None = None, args: dict[str, Any] | None = None) -> int:
+        """Drop cached results: one call (tool + args), one tool, or everything."""
+        if tool is not None and args is not None:
+            keys = [self.key(tool, args)]
+            pattern = None
+        else:
+            pattern = f"{self.prefix}{tool}:*" if tool else f"{self.prefix}*"
+            keys = [k for k in self._lru if k.startswith(pattern[:-1])]
+
+        removed = 0
+        for k in keys:
+            if self._lru.pop(k, None) is not None:
+                removed += 1
+
+        def _drop_remote() -> int:
+            if pattern is None:
+                return self.rds.delete(*keys)
+            n = 0
+            for k in self.rds.scan_iter(match=pattern, count=500):
+                n += self.rds.delete(k)
+            return n
+
+        try:
+            removed = max(removed, await asyncio.to_thread(_drop_remote))
+        except Exception:
+            log.warning("cache_invalidate_failed", tool=tool)
+
+        for t in [tool] if tool else list(self._stats):
+            self._count(t, "invalidations")
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "ttl": self.policies,
+            "tools": self._stats,
+        }
@@ -1,5 +1,8 @@
+import asyncio
 import json
 import os
+import time
+from dataclasses import dataclass, replace
 from datetime import datetime
 from typing import Any
 
@@ -7,13 +10,27 @@ import httpx
 import redis
 import structlog
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from app.audit import RESULT_PREVIEW_CHARS, AuditPipeline
+from app.cache import ToolCache
+from app.masking import Masker
+from app.metrics import install as install_metrics, timed
+from app.resilience import CircuitOpenError, Resilience, ToolPolicy
+from app.singleflight import SingleFlight
+from app.streaming import StreamMasker
+from app.upstreams import UpstreamConfig, UpstreamPools
 
 log = structlog.get_logger("mcp-orchestrator")
 
-INVENTORY_BASE_URL = os.getenv("INVENTORY_BASE_URL", "http://mcp-inventory:8000").rstrip("/")
-HISTORY_BASE_URL = os.getenv("HISTORY_BASE_URL", "http://mcp-history:8000").rstrip("/")
-PRICING_BASE_URL = os.getenv("PRICING_BASE_URL", "http://mcp-pricing:8000").rstrip("/")
+INVENTORY = UpstreamConfig.from_env("inventory", "http://mcp-inventory:8000")
+HISTORY = UpstreamConfig.from_env("history", "http://mcp-history:8000")
+PRICING = UpstreamConfig.from_env("pricing", "http://mcp-pricing:8000")
+
+INVENTORY_BASE_URL = INVENTORY.base_url
+HISTORY_BASE_URL = HISTORY.base_url
+PRICING_BASE_URL = PRICING.base_url
 REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
 
 rds = redis.from_url(REDIS_URL, decode_responses=True)
@@ -24,87 +41,431 @@ class ToolCall(BaseModel):
     args: dict[str, Any] = {}
 
 
-# Public registry (tool name -> remote endpoint)
-TOOL_REGISTRY: dict[str, tuple[str, str]] = {
+class ToolBatch(BaseModel):
+    calls: list[ToolCall] = Field(..., min_length=1, max_length=50)
+    # Overall deadline for the batch; calls still running are reported as "timeout"
+    deadline_ms: int | None = Field(default=None, ge=1, le=60000)
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    base_url: str
+    path: str
+    policy: ToolPolicy
+
+
+# Resilience policy per upstream (attempt timeout, retries, hedging, breaker); env overrides
+# per upstream, e.g. HISTORY_ATTEMPT_TIMEOUT, HISTORY_RETRIES, HISTORY_HEDGE=0
+INVENTORY_POLICY = ToolPolicy(timeout=5.0, budget=8.0, retries=1, hedge=True).with_env("inventory")
+STATS_POLICY = ToolPolicy(timeout=8.0, budget=10.0, retries=1, slow_call=4.0).with_env("stats")
+HISTORY_POLICY = ToolPolicy(timeout=3.0, budget=6.0, retries=2, hedge=True, slow_call=1.5).with_env("history")
+HISTORY_BATCH_POLICY = replace(HISTORY_POLICY, timeout=6.0, budget=8.0, hedge=False, slow_call=3.0)
+PRICING_POLICY = ToolPolicy(timeout=3.0, budget=6.0, retries=1, hedge=True).with_env("pricing")
+
+# Public registry (tool name -> remote endpoint and its call policy)
+TOOL_REGISTRY: dict[str, ToolSpec] = {
     # inventory
-    "inventory.get_car_by_plate": (INVENTORY_BASE_URL, "/tools/get_car_by_plate"),
-    "inventory.search_listings": (INVENTORY_BASE_URL, "/tools/search_listings"),
-    "inventory.compare_listings": (INVENTORY_BASE_URL, "/tools/compare_listings"),
+    "inventory.get_car_by_plate": ToolSpec(INVENTORY_BASE_URL, "/tools/get_car_by_plate", INVENTORY_POLICY),
+    "inventory.search_listings": ToolSpec(INVENTORY_BASE_URL, "/tools/search_listings", INVENTORY_POLICY),
+    "inventory.compare_listings": ToolSpec(INVENTORY_BASE_URL, "/tools/compare_listings", INVENTORY_POLICY),
     # history
-    "history.get_vehicle_registry_summary": (HISTORY_BASE_URL, "/tools/get_vehicle_registry_summary"),
-    "history.get_maintenance_history": (HISTORY_BASE_URL, "/tools/get_maintenance_history"),
+    "history.get_vehicle_registry_summary": ToolSpec(HISTORY_BASE_URL, "/tools/get_vehicle_registry_summary", HISTORY_POLICY),
+    "history.get_maintenance_history": ToolSpec(HISTORY_BASE_URL, "/tools/get_maintenance_history", HISTORY_POLICY),
+    "history.get_vehicle_registry_summary_batch": ToolSpec(HISTORY_BASE_URL, "/tools/get_vehicle_registry_summary_batch", HISTORY_BATCH_POLICY),
+    "history.get_maintenance_history_batch": ToolSpec(HISTORY_BASE_URL, "/tools/get_maintenance_history_batch", HISTORY_BATCH_POLICY),
     # pricing
-    "pricing.get_market_price": (PRICING_BASE_URL, "/tools/get_market_price"),
+    "pricing.get_market_price": ToolSpec(PRICING_BASE_URL, "/tools/get_market_price", PRICING_POLICY),
     # boss
-    "boss.get_monthly_sales_stats": (INVENTORY_BASE_URL, "/tools/get_monthly_sales_stats"),
+    "boss.get_monthly_sales_stats": ToolSpec(INVENTORY_BASE_URL, "/tools/get_monthly_sales_stats", STATS_POLICY),
+}
+
+
+# Result cache TTL (seconds) per idempotent tool; tools not listed are never cached
+TOOL_CACHE_TTL: dict[str, float] = {
+    "inventory.get_car_by_plate": float(os.getenv("CACHE_TTL_INVENTORY", "60")),
+    "inventory.search_listings": float(os.getenv("CACHE_TTL_INVENTORY", "60")),
+    "inventory.compare_listings": float(os.getenv("CACHE_TTL_INVENTORY", "60")),
+    "history.get_vehicle_registry_summary": float(os.getenv("CACHE_TTL_HISTORY", "600")),
+    "history.get_maintenance_history": float(os.getenv("CACHE_TTL_HISTORY", "600")),
+    "pricing.get_market_price": float(os.getenv("CACHE_TTL_PRICING", "300")),
+    "boss.get_monthly_sales_stats": float(os.getenv("CACHE_TTL_STATS", "300")),
+}
+
+
+# Tools whose identical concurrent calls share one upstream request (idempotent reads only)
+TOOL_COALESCE: set[str] = {
+    "inventory.get_car_by_plate",
+    "inventory.search_listings",
+    "inventory.compare_listings",
+    "history.get_vehicle_registry_summary",
+    "history.get_maintenance_history",
+    "history.get_vehicle_registry_summary_batch",
+    "history.get_maintenance_history_batch",
+    "pricing.get_market_price",
+    "boss.get_monthly_sales_stats",
+}
+
+
+# Tools whose large responses are streamed through (masked incrementally) instead of being
+# buffered, parsed and re-serialized. A call is streamed only once the tool's last observed
+# response reached STREAM_MIN_BYTES; small or not-yet-seen responses take the coalesced path
+TOOL_STREAM_SAFE: set[str] = {
+    "inventory.search_listings",
+    "inventory.compare_listings",
+    "boss.get_monthly_sales_stats",
+}
+STREAM_MIN_BYTES = int(os.getenv("STREAM_MIN_BYTES", str(256 * 1024)))
+
+# last observed upstream body size per tool (decides stream vs. coalesced path)
+_response_sizes: dict[str, int] = {}
+
+
+@dataclass(frozen=True)
+class BatchForm:
+    """List form of a single-key tool on the same upstream.
+
+    Calls to the tool that differ only in ``key`` are merged into one call to the registered
+    batch ``tool`` with ``{list_key: [...]}``; the upstream answers
+    ``{"ok": true, "data": {value: item}}``. Merged calls run under the batch tool's policy,
+    breaker and latency window, not the single tool's.
+    """
+
+    tool: str
+    key: str
+    list_key: str
+
+
+# tool name -> list form (only for upstreams that support one)
+BATCH_FORMS: dict[str, BatchForm] = {
+    "history.get_vehicle_registry_summary": BatchForm("history.get_vehicle_registry_summary_batch", key="plate", list_key="plates"),
+    "history.get_maintenance_history": BatchForm("history.get_maintenance_history_batch", key="plate", list_key="plates"),
 }
 
 
 SENSITIVE_KEYS = {"phone", "email", "resident_no", "address", "kakao", "name"}
 
+# Masking plan per tool: key paths holding sensitive fields ("*" = every list item / dict value).
+# An empty tuple declares the response schema free of sensitive fields (no-op plan);
+# tools not listed here are always fully masked.
+TOOL_MASK_PATHS: dict[str, tuple[str, ...]] = {
+    "inventory.get_car_by_plate": (),
+    "inventory.search_listings": (),
+    "inventory.compare_listings": (),
+    "history.get_vehicle_registry_summary": (),
+    "history.get_maintenance_history": (),
+    "history.get_vehicle_registry_summary_batch": (),
+    "history.get_maintenance_history_batch": (),
+    "pricing.get_market_price": (),
+    "boss.get_monthly_sales_stats": (),
+}
+
+masker = Masker(SENSITIVE_KEYS, TOOL_MASK_PATHS, verify_rate=float(os.getenv("MASK_VERIFY_RATE", "0.01")))
+
+
+# One long-lived pooled client per upstream base URL
+pools = UpstreamPools([INVENTORY, HISTORY, PRICING])
+
+cache = ToolCache(rds, TOOL_CACHE_TTL, max_entries=int(os.getenv("CACHE_MAX_ENTRIES", "2048")))
 
-def mask_obj(obj: Any) -> Any:
-    if isinstance(obj, dict):
-        out = {}
-        for k, v in obj.items():
-            if k in SENSITIVE_KEYS:
-                out[k] = "***"
-            else:
-                out[k] = mask_obj(v)
-        return out
-    if isinstance(obj, list):
-        return [mask_obj(x) for x in obj]
-    return obj
+audit = AuditPipeline(
+    REDIS_URL,
+    queue_size=int(os.getenv("AUDIT_QUEUE_SIZE", "10000")),
+    batch_size=int(os.getenv("AUDIT_BATCH_SIZE", "200")),
+    flush_interval=float(os.getenv("AUDIT_FLUSH_INTERVAL", "0.2")),
+    overflow=os.getenv("AUDIT_OVERFLOW", "drop"),
+    spill_path=os.getenv("AUDIT_SPILL_PATH", "/tmp/mcp-audit-spill.jsonl"),
+)
+
+flights = SingleFlight(TOOL_COALESCE if os.getenv("SINGLEFLIGHT_ENABLED", "1") == "1" else set())
+
+resilience = Resilience({tool: spec.policy for tool, spec in TOOL_REGISTRY.items()})
+
+
+class CacheInvalidation(BaseModel):
+    # tool + args: one entry, tool only: every entry of the tool, neither: everything
+    tool: str | None = None
+    args: dict[str, Any] | None = None
 
 
 app = FastAPI(title="MCP Orchestrator", version="0.1.0")
+install_metrics(app)
+
+
+@app.on_event("startup")
+async def on_startup():
+    await pools.start()
+    await audit.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await audit.stop()
+    await pools.aclose()
 
 
 @app.get("/health")
 def health():
-    return {"ok": True, "registry_size": len(TOOL_REGISTRY)}
+    return {
+        "ok": True,
+        "degraded": resilience.open_tools(),
+        "registry_size": len(TOOL_REGISTRY),
+        "pools": pools.stats(),
+        "cache": cache.stats(),
+        "singleflight": flights.stats(),
+        "audit": audit.stats(),
+        "masking": masker.stats(),
+        "breakers": resilience.stats(),
+    }
 
 
 @app.get("/tools")
 def tools():
     return {
         "tools": [
-            {"name": k, "upstream": v[0], "path": v[1]}
+            {"name": k, "upstream": v.base_url, "path": v.path}
             for k, v in sorted(TOOL_REGISTRY.items(), key=lambda x: x[0])
         ]
     }
 
 
+async def _post_upstream(tool: str, path: str, args: dict[str, Any], hedge: bool = True) -> tuple[Any, bytes]:
+    client = pools.client_for(TOOL_REGISTRY[tool].base_url)
+
+    async def attempt() -> tuple[Any, bytes]:
+        res = await client.post(path, json=args)
+        res.raise_for_status()
+        return res.json(), res.content
+
+    with timed("upstream", tool):
+        return await resilience.call(tool, attempt, hedge=hedge)
+
+
+def _mask(tool: str, data: Any, raw: bytes | None) -> Any:
+    with timed("mask", tool):
+        return masker.mask(tool, data, raw)
+
+
+async def _forward(tool: str, args: dict[str, Any]) -> Any:
+    """Call the tool upstream and return its masked body."""
+    data, raw = await _post_upstream(tool, TOOL_REGISTRY[tool].path, args)
+    _response_sizes[tool] = len(raw)
+    return _mask(tool, data, raw)
+
+
+async def _forward_coalesced(tool: str, args: dict[str, Any]) -> Any:
+    return await flights.do(tool, args, lambda: _forward(tool, args))
+
+
+async def _forward_merged(tool: str, args_list: list[dict[str, Any]]) -> list[Any]:
+    """Forward calls to one tool, merged into a single list-form request when possible."""
+    form = BATCH_FORMS.get(tool)
+    if form is None or len(args_list) == 1:
+        return [await _forward_coalesced(tool, args_list[0])]
+
+    common = {k: v for k, v in args_list[0].items() if k != form.key}
+    values = list(dict.fromkeys(a[form.key] for a in args_list))
+    body, raw = await _post_upstream(form.tool, TOOL_REGISTRY[form.tool].path, {**common, form.list_key: values})
+    by_value = body.get("data") or {}
+    with timed("mask", tool):
+        return [masker.mask(tool, {"ok": True, "data": by_value.get(a[form.key])}, raw) for a in args_list]
+
+
+async def _open_stream(tool: str, args: dict[str, Any]) -> httpx.Response:
+    spec = TOOL_REGISTRY[tool]
+    client = pools.client_for(spec.base_url)
+
+    async def attempt() -> httpx.Response:
+        res = await client.send(client.build_request("POST", spec.path, json=args), stream=True)
+        if res.is_error:
+            await res.aclose()
+            res.raise_for_status()
+        return res
+
+    # an open response cannot be raced by a second one, so streams retry but never hedge
+    with timed("upstream", tool):
+        return await resilience.call(tool, attempt, hedge=False)
+
+
+def _expect_large(tool: str) -> bool:
+    return tool in TOOL_STREAM_SAFE and _response_sizes.get(tool, 0) >= STREAM_MIN_BYTES
+
+
+def _should_stream(res: httpx.Response) -> bool:
+    length = res.headers.get("content-length")
+    return length is None or int(length) >= STREAM_MIN_BYTES
+
+
+async def _read_masked(tool: str, res: httpx.Response) -> Any:
+    try:
+        raw = await res.aread()
+    finally:
+        await res.aclose()
+    _response_sizes[tool] = len(raw)
+    return _mask(tool, json.loads(raw), raw)
+
+
+def _stream_response(tool: str, args: dict[str, Any], res: httpx.Response, started: datetime) -> StreamingResponse:
+    # every streamed body goes through the tokenizer: a no-op plan cannot be verified
+    # against bytes that have already been sent, so streams are masked unconditionally
+    stream_masker = StreamMasker(masker.sensitive_keys)
+
+    async def body():
+        preview = bytearray()
+        size = 0
+        try:
+            async for chunk in res.aiter_bytes():
+                size += len(chunk)
+                out = stream_masker.feed(chunk)
+                if len(preview) < RESULT_PREVIEW_CHARS:
+                    preview += out[: RESULT_PREVIEW_CHARS - len(preview)]
+                yield out
+        finally:
+            await res.aclose()
+            _response_sizes[tool] = size
+            _audit(tool, masker.mask_full(args), bytes(preview), started, cache_status="stream")
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+def _group_batch(calls: list[ToolCall]) -> list[tuple[str, list[int]]]:
+    """Group batch indexes into upstream jobs; mergeable calls share one job."""
+    jobs: list[tuple[str, list[int]]] = []
+    merged: dict[tuple[str, str], list[int]] = {}
+    for i, call in enumerate(calls):
+        form = BATCH_FORMS.get(call.tool)
+        if form is None or form.key not in call.args:
+            jobs.append((call.tool, [i]))
+            continue
+        common = {k: v for k, v in call.args.items() if k != form.key}
+        group_key = (call.tool, json.dumps(common, sort_keys=True, ensure_ascii=False))
+        if group_key not in merged:
+            merged[group_key] = []
+            jobs.append((call.tool, merged[group_key]))
+        merged[group_key].append(i)
+    return jobs
+
+
+def _error_status(e: Exception) -> int:
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code
+    if isinstance(e, CircuitOpenError):
+        return 503
+    if isinstance(e, asyncio.TimeoutError):
+        return 504
+    return 502
+
+
+def _audit(tool: str, args: Any, result: Any, started: datetime, cache_status: str = "") -> None:
+    # audit log in redis stream (queued; serialized and written by the background flusher)
+    with timed("audit_enqueue", tool):
+        audit.enqueue(tool, args, result, started, datetime.utcnow(), cache_status)
+
+
 @app.post("/tool/call")
 async def call_tool(payload: ToolCall):
     if payload.tool not in TOOL_REGISTRY:
         raise HTTPException(status_code=404, detail="Unknown tool")
 
-    base, path = TOOL_REGISTRY[payload.tool]
-
     started = datetime.utcnow()
+    with timed("cache", payload.tool):
+        hit, cached = await cache.get(payload.tool, payload.args)
+    if hit:
+        _audit(payload.tool, masker.mask_full(payload.args), cached, started, cache_status="hit")
+        return cached
+
     try:
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            res = await client.post(f"{base}{path}", json=payload.args)
-            res.raise_for_status()
-            data = res.json()
+        if _expect_large(payload.tool):
+            res = await _open_stream(payload.tool, payload.args)
+            if _should_stream(res):
+                return _stream_response(payload.tool, payload.args, res, started)
+            masked = await _read_masked(payload.tool, res)
+        else:
+            masked = await _forward_coalesced(payload.tool, payload.args)
+    except CircuitOpenError as e:
+        log.warning("tool_call_short_circuited", tool=payload.tool)
+        raise HTTPException(
+            status_code=503,
+            detail="Upstream unavailable (circuit open)",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))},
+        )
     except Exception as e:
         log.exception("tool_call_failed", tool=payload.tool)
-        raise HTTPException(status_code=502, detail=f"Upstream error: {type(e).__name__}")
+        status_code = 504 if isinstance(e, asyncio.TimeoutError) else 502
+        raise HTTPException(status_code=status_code, detail=f"Upstream error: {type(e).__name__}")
 
-    masked = mask_obj(data)
+    await cache.set(payload.tool, payload.args, masked)
+    _audit(payload.tool, masker.mask_full(payload.args), masked, started, cache_status="miss" if cache.cacheable(payload.tool) else "")
+    return masked
 
-    # audit log in redis stream
-    event = {
-        "tool": payload.tool,
-        "args": json.dumps(mask_obj(payload.args), ensure_ascii=False),
-        "result": json.dumps(masked, ensure_ascii=False)[:2000],
-        "started_at": started.isoformat(),
-        "finished_at": datetime.utcnow().isoformat(),
-    }
-    try:
-        rds.xadd("mcp:audit", event, maxlen=5000, approximate=True)
-    except Exception:
-        pass
 
-    return masked
+@app.post("/tool/batch")
+async def call_batch(payload: ToolBatch):
+    """Dispatch several tool calls in parallel; results come back in request order."""
+    started = datetime.utcnow()
+    t0 = time.perf_counter()
+    results: list[dict[str, Any] | None] = [None] * len(payload.calls)
+
+    async def run(tool: str, idxs: list[int]) -> None:
+        t_job = time.perf_counter()
+        try:
+            bodies = await _forward_merged(tool, [payload.calls[i].args for i in idxs])
+        except Exception as e:
+            log.warning("tool_call_failed", tool=tool, error=type(e).__name__)
+            outcome = [{"status": "error", "status_code": _error_status(e), "error": f"Upstream error: {type(e).__name__}"}] * len(idxs)
+        else:
+            outcome = [{"status": "ok", "status_code": 200, "result": b} for b in bodies]
+        latency_ms = round((time.perf_counter() - t_job) * 1000, 2)
+        for i, out in zip(idxs, outcome):
+            results[i] = {"tool": tool, **out, "latency_ms": latency_ms}
+        await asyncio.gather(*(cache.set(tool, payload.calls[i].args, out["result"]) for i, out in zip(idxs, outcome) if "result" in out))
+
+    # serve cached calls first; only the rest are grouped and forwarded
+    pending_calls: list[int] = []
+    with timed("cache", "batch"):
+        lookups = await asyncio.gather(*(cache.get(c.tool, c.args) for c in payload.calls))
+    for i, (call, (hit, cached)) in enumerate(zip(payload.calls, lookups)):
+        if hit:
+            results[i] = {"tool": call.tool, "status": "ok", "status_code": 200, "result": cached, "cached": True, "latency_ms": 0.0}
+        else:
+            pending_calls.append(i)
+
+    tasks = []
+    for tool, group in _group_batch([payload.calls[i] for i in pending_calls]):
+        idxs = [pending_calls[j] for j in group]
+        if tool not in TOOL_REGISTRY:
+            for i in idxs:
+                results[i] = {"tool": tool, "status": "error", "status_code": 404, "error": "Unknown tool", "latency_ms": 0.0}
+            continue
+        tasks.append(asyncio.create_task(run(tool, idxs)))
+
+    if tasks:
+        timeout = payload.deadline_ms / 1000 if payload.deadline_ms else None
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for t in pending:
+            t.cancel()
+
+    elapsed_ms = round((time.perf_counter() - t0) * 1000, 2)
+    for i, call in enumerate(payload.calls):
+        if results[i] is None:
+            results[i] = {"tool": call.tool, "status": "timeout", "status_code": 504, "error": "Deadline exceeded", "latency_ms": elapsed_ms}
+
+    _audit(
+        "batch",
+        [{"tool": c.tool, "args": masker.mask_full(c.args)} for c in payload.calls],
+        results,
+        started,
+    )
+    return {"ok": True, "results": results, "latency_ms": elapsed_ms}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return cache.stats()
+
+
+@app.post("/cache/invalidate")
+async def cache_invalidate(payload: CacheInvalidation):
+    if payload.tool is not None and payload.tool not in TOOL_REGISTRY:
+        raise HTTPException(status_code=404, detail="Unknown tool")
+    removed = await cache.invalidate(payload.tool, payload.args)
+    return {"ok": True, "removed": removed}
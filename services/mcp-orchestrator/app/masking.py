@@ -0,0 +1,141 @@
+import random
+from typing import Any
+
+import structlog
+
+log = structlog.get_logger("mcp-orchestrator")
+
+MASK = "***"
+ANY = "*"
+
+
+def mask_obj(obj: Any, sensitive_keys: frozenset[str] | set[str]) -> Any:
+    """Full recursive mask: rebuilds every dict/list (safe fallback for unknown shapes)."""
+    if isinstance(obj, dict):
+        out = {}
+        for k, v in obj.items():
+            if k in sensitive_keys:
+                out[k] = MASK
+            else:
+                out[k] = mask_obj(v, sensitive_keys)
+        return out
+    if isinstance(obj, list):
+        return [mask_obj(x, sensitive_keys) for x in obj]
+    return obj
+
+
+def has_unmasked(obj: Any, sensitive_keys: frozenset[str] | set[str]) -> bool:
+    """True if any sensitive key anywhere in ``obj`` still holds a value other than ``MASK``."""
+    if isinstance(obj, dict):
+        return any((v != MASK) if k in sensitive_keys else has_unmasked(v, sensitive_keys) for k, v in obj.items())
+    if isinstance(obj, list):
+        return any(has_unmasked(x, sensitive_keys) for x in obj)
+    return False
+
+
+def compile_paths(paths: tuple[str, ...]) -> dict[str, Any]:
+    """``("data.items.*.name", ...)`` -> nested plan tree; leaves are ``MASK``.
+
+    ``*`` matches every list item or every dict value (e.g. results keyed by plate).
+    """
+    tree: dict[str, Any] = {}
+    for path in paths:
+        node = tree
+        parts = path.split(".")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = MASK
+    return tree
+
+
+def apply_plan(obj: Any, tree: dict[str, Any]) -> Any:
+    """Mask only the planned paths; untouched subtrees are returned by reference."""
+    if isinstance(obj, list):
+        sub = tree.get(ANY)
+        if sub is None:
+            return obj
+        out = None
+        for i, item in enumerate(obj):
+            new = MASK if sub is MASK else apply_plan(item, sub)
+            if new is not item:
+                if out is None:
+                    out = list(obj)
+                out[i] = new
+        return obj if out is None else out
+
+    if not isinstance(obj, dict):
+        return obj
+
+    out = None
+    for key, sub in tree.items():
+        targets = obj.keys() if key == ANY else ((key,) if key in obj else ())
+        for k in targets:
+            v = obj[k]
+            new = MASK if sub is MASK else apply_plan(v, sub)
+            if new is not v:
+                if out is None:
+                    out = dict(obj)
+                out[k] = new
+    return obj if out is None else out
+
+
+class Masker:
+    """Per-tool masking with a compiled plan.
+
+    Masking fails closed: a plan only ever skips work that the raw bytes prove unnecessary.
+
+    - An empty (no-op) plan passes the parsed body through by reference only when none of
+      the sensitive keys occurs in the raw upstream bytes; every response is scanned, and a
+      hit (or a missing raw body) falls back to the full recursive mask.
+    - A non-empty plan masks only its key paths; a sample of responses (``verify_rate``)
+      is additionally walked for sensitive keys the plan missed and fully masked if any.
+    - Tools without a plan skip masking on the same raw-byte check, and otherwise fall back
+      to the full recursive mask.
+    """
+
+    def __init__(self, sensitive_keys: set[str], plans: dict[str, tuple[str, ...]], verify_rate: float = 0.01) -> None:
+        self.sensitive_keys = frozenset(sensitive_keys)
+        self._tokens = tuple(f'"{k}"'.encode() for k in sorted(sensitive_keys))
+        self.plans: dict[str, dict[str, Any]] = {tool: compile_paths(paths) for tool, paths in plans.items()}
+        self.verify_rate = verify_rate
+        self._stats = {"noop": 0, "planned": 0, "passthrough": 0, "full": 0, "plan_mismatch": 0}
+
+    def may_contain_sensitive(self, raw: bytes) -> bool:
+        # \u escapes could spell a key without matching the plain token
+        return b"\\u" in raw or any(t in raw for t in self._tokens)
+
+    def mask(self, tool: str, data: Any, raw: bytes | None = None) -> Any:
+        tree = self.plans.get(tool)
+        if tree is not None and not tree:
+            if raw is not None and not self.may_contain_sensitive(raw):
+                self._stats["noop"] += 1
+                return data
+            if raw is not None:
+                self._mismatch(tool)
+            return self._full(data)
+        if tree is not None:
+            self._stats["planned"] += 1
+            masked = apply_plan(data, tree)
+            if self.verify_rate and random.random() < self.verify_rate and has_unmasked(masked, self.sensitive_keys):
+                self._mismatch(tool)
+                return self._full(data)
+            return masked
+
+        if raw is not None and not self.may_contain_sensitive(raw):
+            self._stats["passthrough"] += 1
+            return data
+        return self._full(data)
+
+    def _mismatch(self, tool: str) -> None:
+        self._stats["plan_mismatch"] += 1
+        log.warning("mask_plan_mismatch", tool=tool)
+
+    def _full(self, data: Any) -> Any:
+        self._stats["full"] += 1
+        return mask_obj(data, self.sensitive_keys)
+
+    def mask_full(self, data: Any) -> Any:
+        return mask_obj(data, self.sensitive_keys)
+
+    def stats(self) -> dict[str, int]:
+        return dict(self._stats)
@@ -0,0 +1,272 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, replace
+from typing import Any, TypeVar
+
+import httpx
+import structlog
+
+log = structlog.get_logger("mcp-orchestrator")
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class ToolPolicy:
+    """How calls to one tool are bounded, retried, hedged and short-circuited.
+
+    ``timeout`` bounds one attempt and ``budget`` the whole call including retries.
+    Retries (full-jitter exponential backoff) and hedged second requests are only made
+    for idempotent tools. A hedge starts once the first attempt has run longer than the
+    tool's observed ``hedge_quantile`` latency, and at most ``hedge_ratio`` of calls hedge.
+    The breaker counts failures and calls slower than ``slow_call`` over the last
+    ``window`` attempts; at ``failure_ratio`` it opens for ``open_seconds``, then lets a
+    single probe through (half-open) to decide whether to close again.
+    """
+
+    idempotent: bool = True
+    timeout: float = 5.0
+    budget: float = 10.0
+    retries: int = 1
+    backoff: float = 0.05
+    max_backoff: float = 1.0
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_delay: float = 0.05
+    hedge_ratio: float = 0.1
+    slow_call: float = 2.0
+    failure_ratio: float = 0.5
+    window: int = 20
+    min_calls: int = 10
+    open_seconds: float = 10.0
+
+    def with_env(self, name: str) -> "ToolPolicy":
+        # e.g. HISTORY_ATTEMPT_TIMEOUT, HISTORY_RETRIES, HISTORY_HEDGE, HISTORY_BREAKER_OPEN_SECONDS ...
+        prefix = name.upper()
+
+        def env(key: str, default: Any, cast: Callable[[str], Any]) -> Any:
+            raw = os.getenv(f"{prefix}_{key}")
+            return cast(raw) if raw not in (None, "") else default
+
+        return replace(
+            self,
+            timeout=env("ATTEMPT_TIMEOUT", self.timeout, float),
+            budget=env("CALL_BUDGET", self.budget, float),
+            retries=env("RETRIES", self.retries, int),
+            hedge=env("HEDGE", self.hedge, lambda v: v == "1"),
+            slow_call=env("SLOW_CALL", self.slow_call, float),
+            failure_ratio=env("BREAKER_FAILURE_RATIO", self.failure_ratio, float),
+            open_seconds=env("BREAKER_OPEN_SECONDS", self.open_seconds, float),
+        )
+
+
+class CircuitOpenError(Exception):
+    """The tool's breaker is open; the call was rejected without reaching upstream."""
+
+    def __init__(self, tool: str, retry_after: float) -> None:
+        super().__init__(f"circuit open for {tool}")
+        self.tool = tool
+        self.retry_after = retry_after
+
+
+def is_upstream_failure(e: BaseException) -> bool:
+    """Errors that say the upstream is unhealthy (and are worth retrying); 4xx are not."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code >= 500 or e.response.status_code == 429
+    return isinstance(e, (httpx.TransportError, asyncio.TimeoutError))
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a count-based window of attempt outcomes."""
+
+    def __init__(self, tool: str, policy: ToolPolicy) -> None:
+        self.tool = tool
+        self.policy = policy
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.opens = 0
+        self._outcomes: deque[bool] = deque(maxlen=policy.window)  # True = failed or slow
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.policy.open_seconds:
+                return False
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open":
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def retry_after(self) -> float:
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.policy.open_seconds - (time.monotonic() - self.opened_at))
+
+    def record(self, ok: bool, seconds: float) -> None:
+        bad = not ok or seconds >= self.policy.slow_call
+        if self.state == "half_open":
+            self._probing = False
+            if bad:
+                self._trip("probe_failed")
+            else:
+                self.state = "closed"
+                self._outcomes.clear()
+                log.info("breaker_closed", tool=self.tool)
+            return
+        if self.state == "open":
+            return  # a straggler started before the breaker opened
+        self._outcomes.append(bad)
+        n = len(self._outcomes)
+        if n >= self.policy.min_calls and sum(self._outcomes) / n >= self.policy.failure_ratio:
+            self._trip("failure_ratio")
+
+    def release(self) -> None:
+        """An allowed attempt ended without an outcome (cancelled): free the probe slot."""
+        self._probing = False
+
+    def _trip(self, reason: str) -> None:
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.opens += 1
+        self._outcomes.clear()
+        log.warning("breaker_opened", tool=self.tool, reason=reason, open_seconds=self.policy.open_seconds)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "window_calls": len(self._outcomes),
+            "window_bad": sum(self._outcomes),
+            "opens": self.opens,
+            "retry_after_s": round(self.retry_after(), 2),
+        }
+
+
+class LatencyWindow:
+    """Recent successful attempt latencies; quantiles are recomputed every ``refresh`` samples."""
+
+    def __init__(self, size: int = 256, refresh: int = 16, min_samples: int = 20) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._sorted: list[float] = []
+        self._since_sort = 0
+        self.refresh = refresh
+        self.min_samples = min_samples
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_sort += 1
+
+    def quantile(self, q: float) -> float | None:
+        if len(self._samples) < self.min_samples:
+            return None
+        if self._since_sort >= self.refresh or not self._sorted:
+            self._sorted = sorted(self._samples)
+            self._since_sort = 0
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+class _ToolState:
+    def __init__(self, tool: str, policy: ToolPolicy) -> None:
+        self.policy = policy
+        self.breaker = CircuitBreaker(tool, policy)
+        self.latencies = LatencyWindow()
+        self.counts = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "short_circuited": 0}
+
+    def hedge_delay(self) -> float | None:
+        p = self.latencies.quantile(self.policy.hedge_quantile)
+        return None if p is None else max(p, self.policy.hedge_min_delay)
+
+    def may_hedge(self) -> bool:
+        c = self.counts
+        return self.breaker.state == "closed" and c["hedges"] < self.policy.hedge_ratio * c["calls"]
+
+
+class Resilience:
+    """Runs upstream calls under their tool's ``ToolPolicy``; tools without one get ``default``."""
+
+    def __init__(self, policies: dict[str, ToolPolicy], default: ToolPolicy | None = None) -> None:
+        self.policies = policies
+        self.default = default or ToolPolicy()
+        self._tools: dict[str, _ToolState] = {}
+
+    def _state(self, tool: str) -> _ToolState:
+        st = self._tools.get(tool)
+        if st is None:
+            st = self._tools[tool] = _ToolState(tool, self.policies.get(tool, self.default))
+        return st
+
+    async def call(self, tool: str, fn: Callable[[], Awaitable[T]], hedge: bool = True) -> T:
+        st = self._state(tool)
+        policy = st.policy
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + policy.budget
+        st.counts["calls"] += 1
+        hedge = hedge and policy.hedge and policy.idempotent
+        attempt = 0
+        while True:
+            if not st.breaker.allow():
+                st.counts["short_circuited"] += 1
+                raise CircuitOpenError(tool, st.breaker.retry_after())
+            t0 = time.perf_counter()
+            try:
+                timeout = max(0.0, min(policy.timeout, deadline - loop.time()))
+                result = await asyncio.wait_for(self._attempt(st, fn, hedge), timeout)
+            except asyncio.CancelledError:
+                st.breaker.release()
+                raise
+            except Exception as e:
+                failed = is_upstream_failure(e)
+                st.breaker.record(not failed, time.perf_counter() - t0)
+                attempt += 1
+                delay = random.uniform(0, min(policy.max_backoff, policy.backoff * 2 ** (attempt - 1)))
+                if not failed or not policy.idempotent or attempt > policy.retries or loop.time() + delay >= deadline:
+                    raise
+                st.counts["retries"] += 1
+                await asyncio.sleep(delay)
+                continue
+            elapsed = time.perf_counter() - t0
+            st.breaker.record(True, elapsed)
+            st.latencies.add(elapsed)
+            return result
+
+    async def _attempt(self, st: _ToolState, fn: Callable[[], Awaitable[T]], hedge: bool) -> T:
+        delay = st.hedge_delay() if hedge else None
+        if delay is None:
+            return await fn()
+
+        first = asyncio.ensure_future(fn())
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and st.may_hedge():
+                st.counts["hedges"] += 1
+                tasks.add(asyncio.ensure_future(fn()))
+            errors: list[BaseException] = []
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    if t.exception() is None:
+                        if t is not first:
+                            st.counts["hedge_wins"] += 1
+                        return t.result()
+                    errors.append(t.exception())
+            raise errors[0]
+        finally:
+            for t in tasks:
+                t.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        out = {}
+        for tool, st in sorted(self._tools.items()):
+            p = st.latencies.quantile(st.policy.hedge_quantile)
+            out[tool] = {**st.breaker.stats(), **st.counts, "hedge_after_ms": None if p is None else round(p * 1000, 1)}
+        return out
+
+    def open_tools(self) -> list[str]:
+        return [tool for tool, st in sorted(self._tools.items()) if st.breaker.state != "closed"]
@@ -0,0 +1,47 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.cache import canonical_args
+
+
+class SingleFlight:
+    """In-flight deduplication of identical concurrent tool calls.
+
+    Concurrent calls with the same tool and canonical args share one upstream
+    future; followers are counted as "coalesced". Only tools in ``enabled`` take
+    part (they must be idempotent).
+    """
+
+    def __init__(self, enabled: set[str]) -> None:
+        self.enabled = enabled
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def _count(self, tool: str, field: str) -> None:
+        st = self._stats.setdefault(tool, {"leaders": 0, "coalesced": 0})
+        st[field] += 1
+
+    async def do(self, tool: str, args: dict[str, Any], fn: Callable[[], Awaitable[Any]]) -> Any:
+        if tool not in self.enabled:
+            return await fn()
+
+        key = (tool, canonical_args(args))
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(fn())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda f: self._done(key, f))
+            self._count(tool, "leaders")
+        else:
+            self._count(tool, "coalesced")
+        # shield: a cancelled caller must not cancel the call the others are waiting on
+        return await asyncio.shield(fut)
+
+    def _done(self, key: tuple[str, str], fut: asyncio.Future) -> None:
+        self._inflight.pop(key, None)
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved even if every waiter went away
+
+    def stats(self) -> dict[str, Any]:
+        return {"in_flight": len(self._inflight), "tools": self._stats}
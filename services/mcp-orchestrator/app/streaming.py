@@ -0,0 +1,166 @@
+import json
+import re
+
+_STRUCTURAL = re.compile(rb'["{}\[\]:,]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_SCALAR_END = re.compile(rb"[,}\]\s]")
+_WHITESPACE = b" \t\r\n"
+
+MASKED_VALUE = b'"***"'
+
+
+class StreamMasker:
+    """Incremental JSON tokenizer that masks sensitive object keys on the fly.
+
+    Feed raw UTF-8 chunks as they arrive; each ``feed()`` returns the bytes that can be
+    forwarded. The value of any object key in ``sensitive_keys`` (at any depth, whatever
+    its type) is replaced by ``"***"``, matching ``mask_obj``. Only the tokenizer state and
+    the current key are kept between chunks, so memory stays bounded by the chunk size.
+    Structural characters are ASCII, so multi-byte UTF-8 sequences split across chunks are
+    passed through untouched.
+    """
+
+    def __init__(self, sensitive_keys: set[str] | frozenset[str]) -> None:
+        self.keys = {k.encode() for k in sensitive_keys}
+        self.max_key = max((len(k) for k in self.keys), default=0)
+        self.stack: list[int] = []  # b"{"[0] / b"["[0]
+        self.expect_key = False
+        self.in_string = False
+        self.escape = False
+        self.is_key = False
+        self.key_buf = bytearray()
+        self.key_too_long = False
+        self.pending_key: bytes | None = None
+        self.mask_next = False
+        # skipping a masked value: string (depth 0), container (depth > 0) or scalar
+        self.skipping = False
+        self.skip_depth = 0
+        self.skip_scalar = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        out = bytearray()
+        i, n = 0, len(chunk)
+        while i < n:
+            if self.in_string:
+                i = self._string(chunk, i, out)
+            elif self.skip_scalar:
+                m = _SCALAR_END.search(chunk, i)
+                if m is None:
+                    return bytes(out)
+                self.skip_scalar = self.skipping = False
+                i = m.start()
+            elif self.skip_depth:
+                i = self._skip_container(chunk, i)
+            elif self.mask_next:
+                c = chunk[i]
+                if c in _WHITESPACE:
+                    out.append(c)
+                    i += 1
+                    continue
+                self.mask_next = False
+                self.skipping = True
+                out += MASKED_VALUE
+                if c == 0x22:  # "
+                    self.in_string = True
+                    self.is_key = False
+                elif c in (0x7B, 0x5B):  # { [
+                    self.skip_depth = 1
+                else:
+                    self.skip_scalar = True
+                i += 1
+            else:
+                i = self._structural(chunk, i, out)
+        return bytes(out)
+
+    def _structural(self, chunk: bytes, i: int, out: bytearray) -> int:
+        m = _STRUCTURAL.search(chunk, i)
+        if m is None:
+            out += chunk[i:]
+            return len(chunk)
+        j = m.start()
+        out += chunk[i : j + 1]
+        c = chunk[j]
+        if c == 0x22:  # "
+            self.in_string = True
+            self.is_key = bool(self.stack) and self.stack[-1] == 0x7B and self.expect_key
+            self.key_buf.clear()
+            self.key_too_long = False
+        elif c in (0x7B, 0x5B):
+            self.stack.append(c)
+            self.expect_key = c == 0x7B
+        elif c in (0x7D, 0x5D):
+            if self.stack:
+                self.stack.pop()
+            self.expect_key = False
+        elif c == 0x3A:  # :
+            self.mask_next = self.pending_key is not None and self.pending_key in self.keys
+            self.pending_key = None
+            self.expect_key = False
+        else:  # ,
+            self.expect_key = bool(self.stack) and self.stack[-1] == 0x7B
+        return j + 1
+
+    def _string(self, chunk: bytes, i: int, out: bytearray) -> int:
+        if self.escape:
+            self._string_bytes(chunk[i : i + 1], out)
+            self.escape = False
+            return i + 1
+        m = _STRING_SPECIAL.search(chunk, i)
+        if m is None:
+            self._string_bytes(chunk[i:], out)
+            return len(chunk)
+        j = m.start()
+        self._string_bytes(chunk[i:j], out)
+        if chunk[j] == 0x5C:  # backslash
+            self._string_bytes(b"\\", out)
+            self.escape = True
+            return j + 1
+
+        # closing quote
+        self.in_string = False
+        if self.skipping:
+            if not self.skip_depth:
+                self.skipping = False
+            return j + 1
+        out.append(0x22)
+        if self.is_key:
+            self.pending_key = None if self.key_too_long else self._decode_key(bytes(self.key_buf))
+        return j + 1
+
+    def _string_bytes(self, data: bytes, out: bytearray) -> None:
+        if self.skipping:
+            return
+        out += data
+        if self.is_key and not self.key_too_long:
+            self.key_buf += data
+            # escaped keys may be longer than the plain spelling (n...)
+            if len(self.key_buf) > self.max_key * 6:
+                self.key_too_long = True
+
+    def _decode_key(self, raw: bytes) -> bytes:
+        if b"\\" not in raw:
+            return raw
+        try:
+            return json.loads(b'"' + raw + b'"').encode()
+        except ValueError:
+            return raw
+
+    def _skip_container(self, chunk: bytes, i: int) -> int:
+        while True:
+            m = _STRUCTURAL.search(chunk, i)
+            if m is None:
+                return len(chunk)
+            j = m.start()
+            c = chunk[j]
+            if c == 0x22:
+                self.in_string = True
+                self.is_key = False
+                return j + 1
+            if c in (0x7B, 0x5B):
+                self.skip_depth += 1
+            elif c in (0x7D, 0x5D):
+                self.skip_depth -= 1
+                if not self.skip_depth:
+                    self.skipping = False
+                    return j + 1
+            i = j + 1
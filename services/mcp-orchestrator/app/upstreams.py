@@ -0,0 +1,109 @@
+import os
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    name: str
+    base_url: str
+    max_connections: int = 100
+    max_keepalive: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 3.0
+    read_timeout: float = 15.0
+    pool_timeout: float = 5.0
+
+    @classmethod
+    def from_env(cls, name: str, default_url: str) -> "UpstreamConfig":
+        # e.g. INVENTORY_BASE_URL, INVENTORY_POOL_MAX_CONNECTIONS, INVENTORY_READ_TIMEOUT ...
+        prefix = name.upper()
+
+        def env(key: str, default: Any, cast: type) -> Any:
+            raw = os.getenv(f"{prefix}_{key}")
+            return cast(raw) if raw not in (None, "") else default
+
+        return cls(
+            name=name,
+            base_url=os.getenv(f"{prefix}_BASE_URL", default_url).rstrip("/"),
+            max_connections=env("POOL_MAX_CONNECTIONS", cls.max_connections, int),
+            max_keepalive=env("POOL_MAX_KEEPALIVE", cls.max_keepalive, int),
+            keepalive_expiry=env("POOL_KEEPALIVE_EXPIRY", cls.keepalive_expiry, float),
+            connect_timeout=env("CONNECT_TIMEOUT", cls.connect_timeout, float),
+            read_timeout=env("READ_TIMEOUT", cls.read_timeout, float),
+            pool_timeout=env("POOL_TIMEOUT", cls.pool_timeout, float),
+        )
+
+
+class UpstreamPools:
+    """One long-lived pooled AsyncClient per upstream base URL."""
+
+    def __init__(self, configs: list[UpstreamConfig]) -> None:
+        self.configs: dict[str, UpstreamConfig] = {c.base_url: c for c in configs}
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def _build_client(self, cfg: UpstreamConfig) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=cfg.base_url,
+            limits=httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_keepalive,
+                keepalive_expiry=cfg.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(cfg.read_timeout, connect=cfg.connect_timeout, pool=cfg.pool_timeout),
+        )
+
+    async def start(self) -> None:
+        for base_url, cfg in self.configs.items():
+            client = self._clients.get(base_url)
+            if client is None or client.is_closed:
+                self._clients[base_url] = self._build_client(cfg)
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def client_for(self, base_url: str) -> httpx.AsyncClient:
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            cfg = self.configs.get(base_url) or UpstreamConfig(name=base_url, base_url=base_url)
+            self.configs.setdefault(base_url, cfg)
+            client = self._clients[base_url] = self._build_client(cfg)
+        return client
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        out: dict[str, dict[str, Any]] = {}
+        for base_url, cfg in self.configs.items():
+            entry: dict[str, Any] = {
+                "base_url": base_url,
+                "max_connections": cfg.max_connections,
+                "max_keepalive": cfg.max_keepalive,
+                "open": False,
+                "in_use": 0,
+                "idle": 0,
+                "waiters": 0,
+            }
+            client = self._clients.get(base_url)
+            if client is not None and not client.is_closed:
+                entry["open"] = True
+                entry.update(_pool_counters(client))
+            out[cfg.name] = entry
+        return out
+
+
+def _pool_counters(client: httpx.AsyncClient) -> dict[str, int]:
+    # httpx does not expose pool stats publicly; read them from the httpcore pool.
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    if pool is None:
+        return {}
+    conns = list(getattr(pool, "connections", []))
+    requests = list(getattr(pool, "_requests", []))
+    idle = sum(1 for c in conns if c.is_idle())
+    return {
+        "in_use": len(conns) - idle,
+        "idle": idle,
+        "waiters": sum(1 for r in requests if r.is_queued()),
+    }
@@ -0,0 +1,68 @@
+"""Microbenchmark: full recursive mask vs the compiled per-tool masking plans.
+
+Run from services/mcp-orchestrator:
+
+    python -m scripts.bench_masking [--items 5000] [--repeat 20]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from app.masking import Masker, mask_obj
+
+SENSITIVE_KEYS = {"phone", "email", "resident_no", "address", "kakao", "name"}
+
+
+def search_payload(n: int, with_pii: bool) -> dict:
+    items = []
+    for i in range(n):
+        item = {
+            "listing_id": f"L{i:06d}",
+            "plate": f"{i % 100:02d}가{i:04d}",
+            "maker": "현대",
+            "model": "투싼",
+            "year": 2019,
+            "km": 65000 + i,
+            "fuel": "가솔린",
+            "price": 1720,
+            "options": ["ADAS", "네비"],
+        }
+        if with_pii:
+            item["dealer"] = {"name": "홍길동", "phone": "010-0000-0000", "branch_id": "BR01"}
+        items.append(item)
+    return {"ok": True, "data": {"items": items, "explain": "...", "filters": {"no_accident": True}}}
+
+
+def timeit(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    masker = Masker(SENSITIVE_KEYS, {"clean": (), "pii": ("data.items.*.dealer.name", "data.items.*.dealer.phone")}, verify_rate=0.0)
+    cases = (
+        ("no-op plan", "clean", False),
+        ("no plan, raw pre-check", "undeclared", False),
+        ("path plan, dealer contact", "pii", True),
+    )
+    print(f"{'payload':<28} {'full mask ms':>12} {'plan ms':>9} {'speedup':>8}  same output")
+    for label, tool, with_pii in cases:
+        data = search_payload(args.items, with_pii)
+        raw = json.dumps(data, ensure_ascii=False).encode()
+        full_ms = timeit(lambda: mask_obj(data, masker.sensitive_keys), args.repeat)
+        plan_ms = timeit(lambda: masker.mask(tool, data, raw), args.repeat)
+        same = masker.mask(tool, data, raw) == mask_obj(data, masker.sensitive_keys)
+        print(f"{label:<28} {full_ms:>12.2f} {plan_ms:>9.2f} {full_ms / plan_ms:>7.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import math
+import random
+from collections.abc import Iterator
+from datetime import date, timedelta
+from typing import Any
+
+# model -> (maker, new-car price in 만원, typical model years)
+DEMO_MODELS: dict[str, tuple[str, int, tuple[int, int]]] = {
+    "제네시스": ("현대", 5200, (2014, 2022)),
+    "그랜저": ("현대", 4000, (2015, 2024)),
+    "쏘나타": ("현대", 2900, (2014, 2024)),
+    "아반떼": ("현대", 2200, (2015, 2024)),
+    "투싼": ("현대", 3000, (2016, 2024)),
+    "싼타페": ("현대", 3700, (2015, 2024)),
+    "쏘렌토": ("기아", 3500, (2015, 2024)),
+    "스포티지": ("기아", 2900, (2016, 2024)),
+    "K5": ("기아", 2800, (2015, 2024)),
+    "320d": ("BMW", 5300, (2014, 2023)),
+    "520d": ("BMW", 6800, (2014, 2023)),
+    "E클래스": ("벤츠", 7500, (2014, 2023)),
+    "A6": ("아우디", 6900, (2014, 2023)),
+}
+LISTING_MARKUP = 1.06
+
+
+def demo_records(n: int, today: date | None = None, months: int = 6, seed: int = 7) -> Iterator[dict[str, Any]]:
+    """Synthetic trades and listings over the last ``months`` months (demo feed).
+
+    Price depreciates ~7%/year and with mileage, drifts slightly month to month and has
+    log-normal noise; about 40% of records are listings priced above the trades.
+    """
+    today = today or date.today()
+    rnd = random.Random(seed)
+    names = list(DEMO_MODELS)
+    for _ in range(n):
+        model = rnd.choice(names)
+        maker, new_price, (y0, y1) = DEMO_MODELS[model]
+        year = rnd.randint(y0, y1)
+        age = max(today.year - year, 0)
+        km = max(1000, int(rnd.gauss(15000 * max(age, 1), 6000 * max(age, 1) ** 0.5)))
+        days_ago = rnd.randrange(months * 30)
+        price = new_price * 0.93**age * (1 - min(km, 300000) / 1_000_000) * (1 - days_ago / 30 * 0.003)
+        price *= math.exp(rnd.gauss(0, 0.08))
+        listing = rnd.random() < 0.4
+        yield {
+            "source": "listing" if listing else "trade",
+            "maker": maker,
+            "model": model,
+            "year": year,
+            "km": km,
+            "price": round(price * (LISTING_MARKUP if listing else 1)),
+            "date": (today - timedelta(days=days_ago)).isoformat(),
+        }
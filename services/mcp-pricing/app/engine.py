@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+
+from app.segments import ANY, MODELS, Segment, canonical_maker, canonical_model, km_bucket
+from app.sketch import KLLSketch, QuantileTable
+
+log = logging.getLogger("mcp-pricing")
+
+SOURCES = ("trade", "listing")
+
+Key = tuple[Any, Any, Any, Any]
+
+
+def month_index(d: date) -> int:
+    return d.year * 12 + d.month - 1
+
+
+def month_label(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def rollup_keys(maker: str, model: str, year: int, kb: int) -> tuple[Key, ...]:
+    """Every segment a record feeds, from its exact cell up to the whole market."""
+    return (
+        (maker, model, year, kb),
+        (maker, model, year, ANY),
+        (maker, model, ANY, kb),
+        (maker, model, ANY, ANY),
+        (maker, ANY, ANY, ANY),
+        (ANY, ANY, ANY, ANY),
+    )
+
+
+def ladder(segment: Segment) -> list[tuple[str, tuple[Key, ...]]]:
+    """Segments to try for a question, narrowest first.
+
+    The narrow cell is widened to its neighbours (adjacent model year and km bucket) before
+    falling back to the pre-merged parents: model year, model and km, model, maker, market.
+    """
+    maker = segment.maker or (MODELS[segment.model][0] if segment.model in MODELS else None)
+    _, model, year, kb = Segment(maker, segment.model, segment.year, segment.km).key
+    maker = maker or ANY
+    steps: list[tuple[str, tuple[Key, ...]]] = []
+    if model != ANY and year != ANY and kb != ANY:
+        steps.append(("segment", ((maker, model, year, kb),)))
+        neighbours = [(maker, model, y, kb) for y in (year - 1, year, year + 1)]
+        neighbours += [(maker, model, year, b) for b in (kb - 1, kb + 1) if b >= 0]
+        steps.append(("neighbours", tuple(neighbours)))
+    if model != ANY and year != ANY:
+        steps.append(("year", ((maker, model, year, ANY),)))
+    if model != ANY and kb != ANY:
+        steps.append(("model_km", ((maker, model, ANY, kb),)))
+    if model != ANY:
+        steps.append(("model", ((maker, model, ANY, ANY),)))
+    if maker != ANY:
+        steps.append(("maker", ((maker, ANY, ANY, ANY),)))
+    steps.append(("market", ((ANY, ANY, ANY, ANY),)))
+    return steps
+
+
+@dataclass(frozen=True)
+class Band:
+    level: str
+    samples: int
+    window: tuple[str, str]
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+    previous_p50: float | None
+
+
+class PriceEngine:
+    """Market price bands from per-segment KLL sketches over rolling monthly windows.
+
+    Each trade / listing record is added to one sketch per (source, segment, month) for
+    every rollup of its (maker, model, year, km bucket) cell, so parent segments are merged
+    at ingest time rather than per question. A band query merges the last
+    ``window_months`` monthly sketches of the narrowest segment holding at least
+    ``min_samples`` values into a ``QuantileTable`` that is cached until the next ingest:
+    answering is a few dict lookups and binary searches, never a scan over the history.
+    Months older than ``retention_months`` (the current and previous windows) are dropped.
+    Records dated more than ``future_days`` after today are rejected: the newest month
+    drives the window and pruning, so one mistyped date must not expire the history.
+
+    The service answers from a threadpool, so sketch updates, pruning, the window cache
+    and ``stats()`` share one lock; records are parsed before it is taken.
+    """
+
+    def __init__(
+        self,
+        k: int = 200,
+        min_samples: int = 30,
+        window_months: int = 3,
+        retention_months: int = 6,
+        max_windows: int = 20000,
+        future_days: int = 2,
+        today: Callable[[], date] = date.today,
+    ) -> None:
+        self.k = k
+        self.min_samples = min_samples
+        self.window_months = window_months
+        self.retention_months = max(retention_months, window_months)
+        self.max_windows = max_windows
+        self.future_days = future_days
+        self.today = today
+        self.latest_month: int | None = None
+        self.records = 0
+        self._sketches: dict[tuple[str, Key], dict[int, KLLSketch]] = {}
+        self._windows: OrderedDict[tuple[str, tuple[Key, ...], int], QuantileTable | None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ingest(self, records: Iterable[dict[str, Any]]) -> dict[str, int]:
+        """Add trade / listing records; returns accepted, skipped and future-dated counts."""
+        accepted = skipped = future = 0
+        horizon = self.today() + timedelta(days=self.future_days)
+        parsed: list[tuple[str, float, int, tuple[Key, ...]]] = []
+        for r in records:
+            if not isinstance(r, dict):
+                skipped += 1
+                continue
+            try:
+                source = r.get("source", "trade")
+                price = float(r["price"])
+                day = date.fromisoformat(str(r["date"])[:10])
+                keys = rollup_keys(canonical_maker(r["maker"]), canonical_model(r["model"]), int(r["year"]), km_bucket(int(r["km"])))
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+                continue
+            if day > horizon:
+                future += 1
+                continue
+            # NaN / inf would poison the sketch ordering (and round() in the band output)
+            if source not in SOURCES or not math.isfinite(price) or price <= 0:
+                skipped += 1
+                continue
+            parsed.append((source, price, month_index(day), keys))
+
+        with self._lock:
+            oldest = self.latest_month - self.retention_months + 1 if self.latest_month is not None else None
+            for source, price, month, keys in parsed:
+                if oldest is not None and month < oldest:
+                    skipped += 1
+                    continue
+                for key in keys:
+                    months = self._sketches.setdefault((source, key), {})
+                    sketch = months.get(month)
+                    if sketch is None:
+                        sketch = months[month] = KLLSketch(self.k)
+                    sketch.add(price)
+                if self.latest_month is None or month > self.latest_month:
+                    self.latest_month = month
+                accepted += 1
+            self.records += accepted
+            if accepted:
+                self._prune()
+                self._windows.clear()
+        if future:
+            log.warning("pricing_future_records_rejected", extra={"count": future})
+        return {"accepted": accepted, "skipped": skipped, "future": future}
+
+    def load_file(self, path: str | Path) -> dict[str, int]:
+        """Ingest records from a JSON array or a JSON-lines file."""
+        text = Path(path).read_text(encoding="utf-8")
+        if text.lstrip().startswith("["):
+            return self.ingest(json.loads(text))
+        return self.ingest(json.loads(line) for line in text.splitlines() if line.strip())
+
+    def _prune(self) -> None:
+        oldest = self.latest_month - self.retention_months + 1
+        for skey in list(self._sketches):
+            months = self._sketches[skey]
+            for m in [m for m in months if m < oldest]:
+                del months[m]
+            if not months:
+                del self._sketches[skey]
+
+    def _window(self, source: str, cells: tuple[Key, ...], end: int) -> QuantileTable | None:
+        # caller holds self._lock
+        wkey = (source, cells, end)
+        if wkey in self._windows:
+            self._windows.move_to_end(wkey)
+            return self._windows[wkey]
+        merged = KLLSketch(self.k)
+        for cell in cells:
+            months = self._sketches.get((source, cell))
+            if months:
+                for m in range(end - self.window_months + 1, end + 1):
+                    if m in months:
+                        merged.merge(months[m])
+        table = merged.table() if merged.n else None
+        self._windows[wkey] = table
+        while len(self._windows) > self.max_windows:
+            self._windows.popitem(last=False)
+        return table
+
+    def band(self, segment: Segment, source: str = "trade") -> Band | None:
+        """Band from the narrowest segment with enough samples in the current window."""
+        steps = ladder(segment)
+        with self._lock:
+            if self.latest_month is None:
+                return None
+            end = self.latest_month
+            chosen = None
+            for level, cells in steps:
+                table = self._window(source, cells, end)
+                # parents contain their children: if no level is dense enough, the widest wins
+                if table is not None and (chosen is None or table.n > chosen[2].n):
+                    chosen = (level, cells, table)
+                    if table.n >= self.min_samples:
+                        break
+            if chosen is None:
+                return None
+            level, cells, table = chosen
+            previous = self._window(source, cells, end - self.window_months)
+        return Band(
+            level=level,
+            samples=table.n,
+            window=(month_label(end - self.window_months + 1), month_label(end)),
+            p5=table.quantile(0.05),
+            p25=table.quantile(0.25),
+            p50=table.quantile(0.5),
+            p75=table.quantile(0.75),
+            p95=table.quantile(0.95),
+            previous_p50=previous.quantile(0.5) if previous is not None and previous.n >= self.min_samples else None,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "records": self.records,
+                "sketches": sum(len(m) for m in self._sketches.values()),
+                "segments": len({key for _, key in self._sketches}),
+                "latest_month": month_label(self.latest_month) if self.latest_month is not None else None,
+                "cached_windows": len(self._windows),
+            }
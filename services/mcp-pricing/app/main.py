@@ -1,32 +1,98 @@
+import os
+from typing import Any
+
 from fastapi import FastAPI
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.demo import demo_records
+from app.engine import PriceEngine
+from app.metrics import install as install_metrics
+from app.segments import Segment, canonical_maker, canonical_model, parse_segment
 
 app = FastAPI(title="MCP Pricing", version="0.1.0")
+install_metrics(app)
+
+
+# Sketch-based price engine; PRICING_DATA_FILE (JSON / JSON-lines trades and listings)
+# overrides the synthetic demo feed
+engine = PriceEngine(
+    k=int(os.getenv("PRICING_SKETCH_K", "200")),
+    min_samples=int(os.getenv("PRICING_MIN_SAMPLES", "30")),
+    window_months=int(os.getenv("PRICING_WINDOW_MONTHS", "3")),
+)
+if os.getenv("PRICING_DATA_FILE"):
+    engine.load_file(os.environ["PRICING_DATA_FILE"])
+else:
+    engine.ingest(demo_records(int(os.getenv("PRICING_DEMO_RECORDS", "30000"))))
+
+LEVEL_BASIS = {
+    "segment": "동일 모델·연식·주행거리 구간",
+    "neighbours": "동일 모델, 인접 연식·주행거리 구간 병합",
+    "year": "동일 모델·연식",
+    "model_km": "동일 모델·주행거리 구간",
+    "model": "동일 모델 전체",
+    "maker": "동일 제조사 전체",
+    "market": "전체 시장",
+}
 
 
 class MarketPriceRequest(BaseModel):
     query: str
+    # structured segment fields override what is parsed from the query
+    maker: str | None = None
+    model: str | None = None
+    year: int | None = Field(default=None, ge=1980, le=2100)
+    km: int | None = Field(default=None, ge=0)
+
+
+class IngestRequest(BaseModel):
+    # {"source": "trade" | "listing", "maker", "model", "year", "km", "price" (만원), "date": "YYYY-MM-DD"}
+    records: list[dict[str, Any]] = Field(..., min_length=1, max_length=50000)
 
 
 @app.get("/health")
 def health():
-    return {"ok": True}
+    return {"ok": True, "engine": engine.stats()}
+
+
+@app.post("/ingest")
+def ingest(payload: IngestRequest):
+    return {"ok": True, **engine.ingest(payload.records), "engine": engine.stats()}
+
+
+def _segment(payload: MarketPriceRequest) -> Segment:
+    parsed = parse_segment(payload.query)
+    return Segment(
+        maker=canonical_maker(payload.maker) if payload.maker else parsed.maker,
+        model=canonical_model(payload.model) if payload.model else parsed.model,
+        year=payload.year if payload.year is not None else parsed.year,
+        km=payload.km if payload.km is not None else parsed.km,
+    )
 
 
 @app.post("/tools/get_market_price")
 def get_market_price(payload: MarketPriceRequest):
-    q = payload.query.lower()
-    # demo pricing band
-    base = 1750
-    if "bmw" in q or "320" in q:
-        base = 1650
-    if "쏘렌토" in payload.query:
-        base = 1850
-    band = {
-        "p25": base - 120,
-        "p50": base,
-        "p75": base + 130,
-        "range_3m": [base - 250, base + 250],
-        "basis": "최근 3개월 유사매물/거래가 기반(데모)",
+    segment = _segment(payload)
+    band = engine.band(segment)
+    if band is None:
+        return {"ok": True, "data": {"query": payload.query, "segment": segment.describe(), "band": None, "insight": "시세 데이터가 아직 없습니다."}}
+
+    listing = engine.band(segment, source="listing")
+    trend = round((band.p50 / band.previous_p50 - 1) * 100, 1) if band.previous_p50 else None
+    out = {
+        "p25": round(band.p25),
+        "p50": round(band.p50),
+        "p75": round(band.p75),
+        # 3-month spread of actual trades: [p5, p95] (was a fixed ±250 around the demo base)
+        "range_3m": [round(band.p5), round(band.p95)],
+        "samples": band.samples,
+        "level": band.level,
+        "window": list(band.window),
+        "trend_pct": trend,
+        "listing_p50": round(listing.p50) if listing is not None else None,
+        "basis": f"최근 {engine.window_months}개월 실거래가 기반({LEVEL_BASIS[band.level]}, {band.samples}건)",
     }
-    return {"ok": True, "data": {"query": payload.query, "band": band, "insight": "중앙값 기준으로 합리적 제시가를 잡고, 옵션/상태에 따라 ± 조정하세요."}}
+    insight = "중앙값 기준으로 합리적 제시가를 잡고, 옵션/상태에 따라 ± 조정하세요."
+    if band.level not in ("segment", "neighbours"):
+        insight += " 동일 조건 거래가 적어 범위를 넓혀 산출했으니 참고용으로 보세요."
+    return {"ok": True, "data": {"query": payload.query, "segment": segment.describe(), "band": out, "insight": insight}}
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+# km buckets of 20,000km; everything from 200,000km up shares the last bucket
+KM_BUCKET = 20000
+KM_BUCKETS = 10
+
+ANY = "*"
+
+# canonical maker -> aliases (matched on the lower-cased query)
+MAKER_ALIASES: dict[str, tuple[str, ...]] = {
+    "현대": ("현대", "hyundai"),
+    "기아": ("기아", "kia"),
+    "BMW": ("bmw", "비엠"),
+    "벤츠": ("벤츠", "benz", "mercedes"),
+    "아우디": ("아우디", "audi"),
+}
+# canonical model -> (maker, aliases); a model implies its maker
+MODELS: dict[str, tuple[str, tuple[str, ...]]] = {
+    "제네시스": ("현대", ("제네시스", "genesis", "g330")),
+    "그랜저": ("현대", ("그랜저", "grandeur")),
+    "쏘나타": ("현대", ("쏘나타", "소나타", "sonata")),
+    "아반떼": ("현대", ("아반떼", "avante")),
+    "투싼": ("현대", ("투싼", "tucson")),
+    "싼타페": ("현대", ("싼타페", "santafe")),
+    "쏘렌토": ("기아", ("쏘렌토", "sorento")),
+    "스포티지": ("기아", ("스포티지", "sportage")),
+    "K5": ("기아", ("k5",)),
+    "320d": ("BMW", ("320d",)),
+    "520d": ("BMW", ("520d",)),
+    "E클래스": ("벤츠", ("e클래스", "e-class", "e300", "e220")),
+    "A6": ("아우디", ("a6",)),
+}
+
+_MAKER_OF = {a: canon for canon, names in MAKER_ALIASES.items() for a in names}
+_MODEL_OF = {a: canon for canon, (_, names) in MODELS.items() for a in names}
+
+_TERMS = sorted([*_MAKER_OF, *_MODEL_OF], key=len, reverse=True)
+_QUERY_PAT = re.compile(
+    r"(?P<km>\d+(?:\.\d+)?)\s*(?P<km_unit>만)?\s*(?:km|키로|킬로)"
+    r"|(?P<year>(?:19|20)?\d{2})\s*년\s*식?"
+    r"|(?<!\d)(?P<year4>20[0-3]\d)(?!\d)"
+    rf"|(?P<term>{'|'.join(re.escape(t) for t in _TERMS)})"
+)
+
+
+def km_bucket(km: int) -> int:
+    return min(max(km, 0) // KM_BUCKET, KM_BUCKETS)
+
+
+def canonical_maker(value: str) -> str:
+    return _MAKER_OF.get(value.strip().lower(), value.strip())
+
+
+def canonical_model(value: str) -> str:
+    v = value.strip().lower()
+    if v in _MODEL_OF:
+        return _MODEL_OF[v]
+    # legacy feeds carry trims in the model name ("제네시스 G330")
+    for alias in _TERMS:
+        if alias in _MODEL_OF and alias in v:
+            return _MODEL_OF[alias]
+    return value.strip()
+
+
+@dataclass(frozen=True)
+class Segment:
+    """Market segment of a price question; unknown parts are ``None``."""
+
+    maker: str | None = None
+    model: str | None = None
+    year: int | None = None
+    km: int | None = None
+
+    @property
+    def key(self) -> tuple[str, str, int | str, int | str]:
+        return (
+            self.maker or ANY,
+            self.model or ANY,
+            self.year if self.year is not None else ANY,
+            km_bucket(self.km) if self.km is not None else ANY,
+        )
+
+    def describe(self) -> dict[str, object]:
+        out: dict[str, object] = {"maker": self.maker, "model": self.model, "year": self.year}
+        if self.km is not None:
+            b = km_bucket(self.km)
+            out["km_range"] = [b * KM_BUCKET, None if b == KM_BUCKETS else (b + 1) * KM_BUCKET]
+        return out
+
+
+def parse_segment(query: str) -> Segment:
+    return _parse(" ".join(query.lower().split()))
+
+
+@lru_cache(maxsize=4096)
+def _parse(q: str) -> Segment:
+    maker = model = None
+    year = km = None
+    for m in _QUERY_PAT.finditer(q):
+        if m.group("km"):
+            km = int(float(m.group("km")) * (10000 if m.group("km_unit") else 1))
+        elif m.group("year") or m.group("year4"):
+            y = int(m.group("year") or m.group("year4"))
+            year = y + (2000 if y <= 50 else 1900) if y < 100 else y
+        else:
+            term = m.group("term")
+            if term in _MODEL_OF and model is None:
+                model = _MODEL_OF[term]
+                maker = maker or MODELS[model][0]
+            elif term in _MAKER_OF and maker is None:
+                maker = _MAKER_OF[term]
+    return Segment(maker=maker, model=model, year=year, km=km)
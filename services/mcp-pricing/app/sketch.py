@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import math
+import random
+from bisect import bisect_left
+from collections.abc import Iterable
+
+
+class KLLSketch:
+    """Mergeable KLL quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Level ``h`` holds items of weight ``2**h``; a full level is sorted and every other item
+    (random offset) is promoted to the next one. Capacities shrink geometrically (factor
+    ``c``) towards the lower levels, so memory stays ``O(k)`` however many values are
+    added, with rank error around ``1.7 / k``. Two sketches merge level by level, which is
+    what lets monthly sketches be combined into rolling windows and parent segments.
+    """
+
+    def __init__(self, k: int = 200, c: float = 2 / 3, seed: int | None = None) -> None:
+        self.k = k
+        self.c = c
+        self.levels: list[list[float]] = [[]]
+        self.n = 0
+        self.size = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._rng = random.Random(seed)
+        self._max_size = self._capacity(0)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(2, int(math.ceil(self.k * self.c**depth)))
+
+    def _grow(self) -> None:
+        self.levels.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def add(self, value: float) -> None:
+        self.levels[0].append(value)
+        self.n += 1
+        self.size += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if self.size >= self._max_size:
+            self._compress()
+
+    def extend(self, values: Iterable[float]) -> None:
+        for v in values:
+            self.add(v)
+
+    def _compress(self) -> None:
+        for h in range(len(self.levels)):
+            level = self.levels[h]
+            if len(level) < self._capacity(h):
+                continue
+            if h + 1 == len(self.levels):
+                self._grow()
+            level.sort()
+            # an odd item out stays behind at this level
+            keep = [level.pop()] if len(level) % 2 else []
+            self.levels[h + 1].extend(level[self._rng.random() < 0.5 :: 2])
+            self.levels[h] = keep
+            self.size = sum(len(lv) for lv in self.levels)
+            if self.size < self._max_size:
+                break
+
+    def merge(self, other: KLLSketch) -> None:
+        """Fold ``other`` into this sketch (``other`` is left unchanged)."""
+        if not other.n:
+            return
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self.size = sum(len(lv) for lv in self.levels)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        while self.size >= self._max_size:
+            before = self.size
+            self._compress()
+            if self.size == before:
+                break
+
+    def table(self) -> QuantileTable:
+        items = sorted((v, 1 << h) for h, level in enumerate(self.levels) for v in level)
+        return QuantileTable([v for v, _ in items], [w for _, w in items], self.n, self.min, self.max)
+
+
+class QuantileTable:
+    """Frozen sketch summary: sorted retained values with cumulative weights.
+
+    A quantile is one binary search over at most a few hundred entries, independent of
+    how many values went into the sketch.
+    """
+
+    __slots__ = ("values", "cumulative", "n", "min", "max")
+
+    def __init__(self, values: list[float], weights: list[int], n: int, lo: float, hi: float) -> None:
+        self.values = values
+        self.cumulative: list[int] = []
+        total = 0
+        for w in weights:
+            total += w
+            self.cumulative.append(total)
+        self.n = n
+        self.min = lo
+        self.max = hi
+
+    def quantile(self, q: float) -> float:
+        if not self.values:
+            raise ValueError("empty sketch")
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        target = q * self.cumulative[-1]
+        return self.values[min(len(self.values) - 1, bisect_left(self.cumulative, target))]
@@ -0,0 +1,99 @@
+"""Ingest cost, band query latency and accuracy of the sketch price engine.
+
+Loads ``--records`` synthetic trades / listings, then answers band questions for random
+segments: cold (first question after an ingest merges the window) and warm (cached
+window). A few questions are also answered by scanning the raw records, for the
+latency baseline and to check the sketch quantiles against exact ones. Run from
+services/mcp-pricing:
+
+    python -m scripts.bench_pricing [--records 1000000] [--queries 20000]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from datetime import date
+
+from app.demo import DEMO_MODELS, demo_records
+from app.engine import PriceEngine, month_index
+from app.segments import Segment, km_bucket
+
+
+def percentile_us(samples: list[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6
+
+
+def random_segments(n: int, seed: int = 3) -> list[Segment]:
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(n):
+        model = rnd.choice(list(DEMO_MODELS))
+        maker, _, (y0, y1) = DEMO_MODELS[model]
+        out.append(Segment(maker, model, rnd.randint(y0, y1), rnd.randrange(0, 200000)))
+    return out
+
+
+def scan_band(records: list[dict], segment: Segment, first_month: int) -> list[float]:
+    """Baseline: filter the raw history and sort the matching prices."""
+    kb = km_bucket(segment.km)
+    prices = sorted(
+        r["price"]
+        for r in records
+        if r["source"] == "trade"
+        and r["model"] == segment.model
+        and r["year"] == segment.year
+        and km_bucket(r["km"]) == kb
+        and r["month"] >= first_month
+    )
+    return [prices[int(q * (len(prices) - 1))] for q in (0.25, 0.5, 0.75)] if prices else []
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--records", type=int, default=1_000_000)
+    ap.add_argument("--queries", type=int, default=20000)
+    ap.add_argument("--scans", type=int, default=20)
+    args = ap.parse_args()
+
+    records = list(demo_records(args.records))
+    for r in records:
+        r["month"] = month_index(date.fromisoformat(r["date"]))
+
+    engine = PriceEngine()
+    t0 = time.perf_counter()
+    engine.ingest(records)
+    t_ingest = time.perf_counter() - t0
+    print(f"ingest: {args.records} records in {t_ingest:.1f}s ({t_ingest / args.records * 1e6:.1f} us/record), {engine.stats()}")
+
+    segments = random_segments(args.queries)
+    cold, warm = [], []
+    for seg in segments:
+        t0 = time.perf_counter()
+        engine.band(seg)
+        cold.append(time.perf_counter() - t0)
+    for seg in segments:
+        t0 = time.perf_counter()
+        engine.band(seg)
+        warm.append(time.perf_counter() - t0)
+    for name, samples in (("first question", cold), ("cached window", warm)):
+        print(f"{name:>15}: p50 {percentile_us(samples, 0.5):8.1f} us  p99 {percentile_us(samples, 0.99):8.1f} us")
+
+    first_month = engine.latest_month - engine.window_months + 1
+    scans, errors = [], []
+    for seg in segments[: args.scans]:
+        t0 = time.perf_counter()
+        exact = scan_band(records, seg, first_month)
+        scans.append(time.perf_counter() - t0)
+        band = engine.band(seg)
+        if exact and band.level == "segment":
+            errors += [abs(b / e - 1) for b, e in zip((band.p25, band.p50, band.p75), exact)]
+    print(f"{'full scan':>15}: p50 {percentile_us(scans, 0.5):8.1f} us")
+    if errors:
+        print(f"sketch vs exact quartiles on exact-segment answers: mean {statistics.mean(errors):.2%}, max {max(errors):.2%}")
+
+
+if __name__ == "__main__":
+    main()